@@ -1,20 +1,45 @@
 import asyncio
+import datetime
 import logging
 
+import pytz
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
 from aiogram.fsm.storage.memory import MemoryStorage
 from aiogram.fsm.storage.redis import DefaultKeyBuilder, RedisStorage
 from aiogram.types import BotCommand
 
-from infrastructure.database.setup import create_engine, create_session_pool
+from infrastructure.database.cache.active_questions import active_questions
+from infrastructure.database.cache.stats import question_counters
+from infrastructure.database.cache.users import user_cache
+from infrastructure.database.repo.requests import RequestsRepo
+from infrastructure.database.setup import (
+    check_schema_version,
+    create_engine,
+    create_session_pool,
+)
 from tgbot.config import Config, load_config
 from tgbot.handlers import routers_list
 from tgbot.middlewares.config import ConfigMiddleware
 from tgbot.middlewares.database import DatabaseMiddleware
+from tgbot.middlewares.fsm_snapshot import FSMSnapshotMiddleware
+from tgbot.middlewares.media_group import MediaGroupMiddleware
+from tgbot.middlewares.rate_limit import RateLimitMiddleware
 from tgbot.services import broadcaster
+from tgbot.services.deletion import deletion_queue
+from tgbot.services.http_session import TunedAiohttpSession
+from tgbot.services.inactivity import inactivity_tracker
+from tgbot.services.jobs import job_runner
 from tgbot.services.logger import setup_logging
-from tgbot.services.scheduler import remove_old_topics, scheduler
+from tgbot.services.scheduler import (
+    INACTIVITY_SWEEP_SECONDS,
+    PURGE_TIMEOUT,
+    remove_old_topics,
+    scheduler,
+    sweep_inactive_questions,
+)
+from tgbot.services.topic_pool import topic_pool
+from tgbot.services.webhook import run_webhook
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +50,32 @@ async def on_startup(bot: Bot, admin_ids: list[int]):
     await broadcaster.broadcast(bot, admin_ids, "Bot started")
 
 
+async def warm_caches(session_pool):
+    """
+    Warm process-wide caches from the database before handling updates.
+
+    Inactivity deadlines of active questions are restored from their last activity,
+    deadlines missed while the bot was down are handled by the first sweep.
+
+    :param session_pool: Session pool object for the database using SQLAlchemy.
+    :return: None
+    """
+    async with session_pool() as session:
+        repo = RequestsRepo(session)
+        questions = await repo.questions.get_active_questions()
+
+    active_questions.warm(questions)
+    logger.info(f"[Кэш] Загружено активных вопросов: {len(active_questions)}")
+
+    if bot_config.tg_bot.activity_status:
+        inactivity_tracker.restore(
+            (question.Token, question.LastActivity) for question in questions
+        )
+        logger.info(
+            f"[Таймер неактивности] Восстановлено таймеров: {len(inactivity_tracker)}"
+        )
+
+
 def register_global_middlewares(
     dp: Dispatcher, config: Config, bot: Bot, session_pool=None
 ):
@@ -38,9 +89,13 @@ def register_global_middlewares(
     :param session_pool: Optional session pool object for the database using SQLAlchemy.
     :return: None
     """
+    # Альбомы собираются до открытия сессии БД
+    dp.message.outer_middleware(MediaGroupMiddleware())
+
     middleware_types = [
         ConfigMiddleware(config),
         DatabaseMiddleware(config=config, bot=bot, session_pool=session_pool),
+        FSMSnapshotMiddleware(),
     ]
 
     for middleware_type in middleware_types:
@@ -74,9 +129,21 @@ async def main():
     config = load_config(".env")
     storage = get_storage(config)
 
+    session = TunedAiohttpSession(config.http) if config.http else None
     bot = Bot(
-        token=config.tg_bot.token, default=DefaultBotProperties(parse_mode="HTML")
+        token=config.tg_bot.token,
+        session=session,
+        default=DefaultBotProperties(parse_mode="HTML"),
+    )
+    rate_limiter = RateLimitMiddleware(
+        global_rate=config.tg_bot.rate_limit_global,
+        private_rate=config.tg_bot.rate_limit_private,
+        private_burst=config.tg_bot.rate_limit_private_burst,
+        group_rate=config.tg_bot.rate_limit_group_per_minute / 60,
+        group_burst=config.tg_bot.rate_limit_group_burst,
+        max_queue=config.tg_bot.rate_limit_queue,
     )
+    bot.session.middleware(rate_limiter)
     await bot.set_my_commands(
         commands=[
             BotCommand(command="start", description="Главное меню"),
@@ -90,6 +157,7 @@ async def main():
 
     # Create engines for different databases
     stp_db_engine = create_engine(config.db, db_name=config.db.main_db)
+    await check_schema_version(stp_db_engine)
 
     stp_db = create_session_pool(stp_db_engine)
 
@@ -100,13 +168,63 @@ async def main():
 
     register_global_middlewares(dp, bot_config, bot, stp_db)
 
-    scheduler.add_job(remove_old_topics, "interval", hours=12, args=[bot, stp_db])
+    question_counters.enabled = config.tg_bot.question_counters
+
+    await warm_caches(stp_db)
+
+    job_runner.setup(stp_db)
+    scheduler.add_job(
+        job_runner.run,
+        "interval",
+        hours=1,
+        args=[remove_old_topics, bot],
+        kwargs={"timeout": PURGE_TIMEOUT},
+        max_instances=1,
+        coalesce=True,
+    )
+    scheduler.add_job(rate_limiter.log_stats, "interval", minutes=5)
+    scheduler.add_job(user_cache.log_stats, "interval", minutes=5)
+    if session:
+        scheduler.add_job(session.log_stats, "interval", minutes=5)
+    scheduler.add_job(
+        deletion_queue.flush,
+        "interval",
+        seconds=deletion_queue.resolution,
+        args=[bot],
+        max_instances=1,
+        coalesce=True,
+    )
+    if config.tg_bot.activity_status:
+        # Первая проверка сразу после запуска обрабатывает сроки, истекшие за время простоя
+        scheduler.add_job(
+            job_runner.run,
+            "interval",
+            seconds=INACTIVITY_SWEEP_SECONDS,
+            next_run_time=datetime.datetime.now(tz=pytz.utc),
+            args=[sweep_inactive_questions, bot],
+            kwargs={"timeout": None},
+            max_instances=1,
+            coalesce=True,
+        )
     scheduler.start()
 
+    topic_pool.setup(stp_db)
+    await topic_pool.restore(bot)
+
+    resumed = broadcaster.resume_broadcasts(bot)
+    if resumed:
+        logger.info(f"[Рассылка] Продолжено прерванных рассылок: {resumed}")
+
     # await on_startup(bot, config.tg_bot.admin_ids)
     try:
-        await dp.start_polling(bot)
+        if config.webhook and config.webhook.use_webhook:
+            await run_webhook(dp, bot, config.webhook)
+        else:
+            # Вебхук, оставшийся после запуска в режиме вебхука, блокирует getUpdates
+            await bot.delete_webhook()
+            await dp.start_polling(bot)
     finally:
+        topic_pool.stop()
         await stp_db_engine.dispose()
 
 
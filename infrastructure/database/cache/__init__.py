@@ -0,0 +1,4 @@
+from .active_questions import ActiveQuestionEntry, ActiveQuestionsRegistry, active_questions
+from .schedule import WorkSchedule, WorkScheduleCache, work_schedules
+from .stats import QuestionCounters, question_counters
+from .users import UserCache, user_cache
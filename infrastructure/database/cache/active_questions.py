@@ -0,0 +1,96 @@
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from infrastructure.database.models.question import Question
+
+ACTIVE_STATUSES = ("open", "in_progress")
+
+
+@dataclass(frozen=True, slots=True)
+class ActiveQuestionEntry:
+    """
+    Легковесный снимок активного вопроса, хранящийся в реестре.
+
+    Attributes:
+        token (str): Токен вопроса.
+        topic_id (int): ID топика.
+        employee_chat_id (int): Chat ID сотрудника.
+        status (str): Статус вопроса (open или in_progress).
+    """
+
+    token: str
+    topic_id: int
+    employee_chat_id: int
+    status: str
+
+
+class ActiveQuestionsRegistry:
+    """
+    Реестр активных вопросов процесса с поиском по Chat ID сотрудника и ID топика за O(1).
+
+    Заполняется при старте бота и обновляется методами QuestionsRepo,
+    изменяющими статус вопроса, поэтому фильтрам не нужно обращаться к БД.
+    """
+
+    def __init__(self):
+        self._by_token: dict[str, ActiveQuestionEntry] = {}
+        self._by_employee: dict[int, ActiveQuestionEntry] = {}
+        self._by_topic: dict[int, ActiveQuestionEntry] = {}
+        self.warmed = False
+
+    def warm(self, questions: Iterable[Question]) -> None:
+        """
+        Полностью перестраивает реестр по списку активных вопросов из БД.
+        """
+        self._by_token.clear()
+        self._by_employee.clear()
+        self._by_topic.clear()
+
+        for question in questions:
+            self.put(question)
+
+        self.warmed = True
+
+    def put(self, question: Question) -> None:
+        """
+        Добавляет или обновляет вопрос в реестре. Неактивные вопросы из реестра удаляются.
+        """
+        if question.Status not in ACTIVE_STATUSES:
+            self.discard(question.Token)
+            return
+
+        self.discard(question.Token)
+        entry = ActiveQuestionEntry(
+            token=question.Token,
+            topic_id=question.TopicId,
+            employee_chat_id=question.EmployeeChatId,
+            status=question.Status,
+        )
+        self._by_token[entry.token] = entry
+        self._by_employee[entry.employee_chat_id] = entry
+        self._by_topic[entry.topic_id] = entry
+
+    def discard(self, token: str) -> None:
+        """
+        Удаляет вопрос из реестра, если он там есть.
+        """
+        entry = self._by_token.pop(token, None)
+        if entry is None:
+            return
+
+        if self._by_employee.get(entry.employee_chat_id) is entry:
+            del self._by_employee[entry.employee_chat_id]
+        if self._by_topic.get(entry.topic_id) is entry:
+            del self._by_topic[entry.topic_id]
+
+    def by_employee(self, employee_chat_id: int) -> Optional[ActiveQuestionEntry]:
+        return self._by_employee.get(employee_chat_id)
+
+    def by_topic(self, topic_id: int) -> Optional[ActiveQuestionEntry]:
+        return self._by_topic.get(topic_id)
+
+    def __len__(self) -> int:
+        return len(self._by_token)
+
+
+active_questions = ActiveQuestionsRegistry()
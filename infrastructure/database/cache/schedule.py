@@ -0,0 +1,63 @@
+import time
+from dataclasses import dataclass
+from datetime import date
+from typing import Optional
+
+
+@dataclass(frozen=True, slots=True)
+class WorkSchedule:
+    """
+    График работающих сегодня сотрудников направления.
+
+    Attributes:
+        day (date): День, на который был загружен график.
+        raw (str): Исходные данные графика из BufferForBot.
+    """
+
+    day: date
+    raw: str
+
+    @classmethod
+    def parse(cls, raw: Optional[str], day: date) -> "WorkSchedule":
+        return cls(day=day, raw=raw or "")
+
+    def is_working(self, fio: str) -> bool:
+        # Формат буфера задается ботом графиков, поэтому проверяем вхождение ФИО в исходные данные
+        return fio in self.raw
+
+
+class WorkScheduleCache:
+    """
+    Кэш графиков по направлениям.
+
+    График действует до смены дня или до истечения ttl секунд, после чего перечитывается из БД.
+    """
+
+    def __init__(self, ttl: float = 600):
+        self.ttl = ttl
+        self._schedules: dict[str, tuple[float, WorkSchedule]] = {}
+
+    def get(self, division: str) -> Optional[WorkSchedule]:
+        item = self._schedules.get(division)
+        if item is None:
+            return None
+
+        expires_at, schedule = item
+        if expires_at <= time.monotonic() or schedule.day != date.today():
+            del self._schedules[division]
+            return None
+        return schedule
+
+    def put(self, division: str, raw: Optional[str]) -> WorkSchedule:
+        schedule = WorkSchedule.parse(raw, date.today())
+        self._schedules[division] = (time.monotonic() + self.ttl, schedule)
+        return schedule
+
+    def invalidate(self, division: Optional[str] = None) -> None:
+        if division is None:
+            self._schedules.clear()
+        else:
+            self._schedules.pop(division, None)
+
+
+work_schedules = WorkScheduleCache()
@@ -0,0 +1,84 @@
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Optional
+
+
+@dataclass(slots=True)
+class QuestionCount:
+    """
+    Счетчики вопросов одного человека.
+
+    Attributes:
+        day (date): День, к которому относится today.
+        today (int): Количество вопросов за день.
+        month (int): Количество вопросов за месяц дня day.
+    """
+
+    day: date
+    today: int
+    month: int
+
+
+class QuestionCounters:
+    """
+    Инкрементально поддерживаемые счетчики вопросов за день и месяц по ФИО.
+
+    Счетчик заполняется из БД при первом обращении и дальше обновляется при добавлении вопроса
+    и взятии его в работу. Счетчики живут в памяти процесса, поэтому включаются только при запуске
+    бота в одном экземпляре.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._counts: dict[tuple[str, str], QuestionCount] = {}
+
+    def get(self, role: str, fullname: str) -> Optional[tuple[int, int]]:
+        """
+        Возвращает (за день, за месяц) или None, если счетчика нет или он устарел.
+        """
+        if not self.enabled:
+            return None
+
+        count = self._counts.get((role, fullname))
+        if count is None:
+            return None
+
+        today = date.today()
+        if (count.day.year, count.day.month) != (today.year, today.month):
+            del self._counts[(role, fullname)]
+            return None
+        if count.day != today:
+            count.day = today
+            count.today = 0
+        return count.today, count.month
+
+    def seed(self, role: str, fullname: str, today_count: int, month_count: int) -> None:
+        if self.enabled:
+            self._counts[(role, fullname)] = QuestionCount(
+                day=date.today(), today=today_count, month=month_count
+            )
+
+    def bump(self, role: str, fullname: str, start_time: datetime, delta: int = 1) -> None:
+        """
+        Учитывает вопрос с датой начала start_time в счетчиках человека, если они уже заполнены.
+        """
+        if not fullname or self.get(role, fullname) is None:
+            return
+
+        count = self._counts[(role, fullname)]
+        start_day = start_time.date()
+        if (start_day.year, start_day.month) == (count.day.year, count.day.month):
+            count.month = max(count.month + delta, 0)
+            if start_day == count.day:
+                count.today = max(count.today + delta, 0)
+
+    def invalidate(self, role: Optional[str] = None, fullname: Optional[str] = None) -> None:
+        if role and fullname:
+            self._counts.pop((role, fullname), None)
+            return
+
+        for key in [key for key in self._counts if role is None or key[0] == role]:
+            del self._counts[key]
+
+
+question_counters = QuestionCounters()
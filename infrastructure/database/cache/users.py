@@ -0,0 +1,93 @@
+import logging
+from typing import Optional
+
+from infrastructure.database.cache.lru import MISSING, TTLCache
+from infrastructure.database.models.user import User
+from tgbot.services.logger import setup_logging
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+
+class UserCache:
+    """
+    Кэш снимков пользователей из RegisteredUsers с поиском по ChatId, ФИО и Username.
+
+    Таблица пользователей меняется редко и пишется другими ботами, поэтому снимки живут ttl секунд.
+    Если снимок мог устареть (например, пользователю не хватает роли), запись сбрасывается
+    через invalidate и пользователь перечитывается из БД.
+    """
+
+    def __init__(self, maxsize: int = 2048, ttl: float = 300):
+        self._by_chat_id: TTLCache[int, User] = TTLCache(maxsize, ttl)
+        self._by_fio: TTLCache[str, User] = TTLCache(maxsize, ttl)
+        self._by_username: TTLCache[str, User] = TTLCache(maxsize, ttl)
+
+    def get(
+        self,
+        user_id: Optional[int] = None,
+        username: Optional[str] = None,
+        fullname: Optional[str] = None,
+    ):
+        """
+        Возвращает пользователя по одному из ключей или MISSING, если в кэше его нет.
+        """
+        if user_id:
+            return self._by_chat_id.get(user_id)
+        if fullname:
+            return self._by_fio.get(fullname)
+        if username:
+            return self._by_username.get(username)
+        return MISSING
+
+    def put(self, user: User) -> None:
+        if user.ChatId:
+            self._by_chat_id.set(user.ChatId, user)
+        if user.FIO:
+            self._by_fio.set(user.FIO, user)
+        if user.Username:
+            self._by_username.set(user.Username, user)
+
+    def invalidate(
+        self,
+        user_id: Optional[int] = None,
+        username: Optional[str] = None,
+        fullname: Optional[str] = None,
+    ) -> None:
+        """
+        Сбрасывает пользователя по любому из ключей вместе со всеми его остальными ключами.
+        """
+        user = None
+        if user_id:
+            user = self._by_chat_id.pop(user_id)
+        if fullname:
+            user = self._by_fio.pop(fullname) or user
+        if username:
+            user = self._by_username.pop(username) or user
+
+        if user is not None:
+            self._by_chat_id.pop(user.ChatId)
+            self._by_fio.pop(user.FIO)
+            self._by_username.pop(user.Username)
+
+    def clear(self) -> None:
+        self._by_chat_id.clear()
+        self._by_fio.clear()
+        self._by_username.clear()
+
+    def stats(self) -> dict[str, int]:
+        caches = (self._by_chat_id, self._by_fio, self._by_username)
+        return {
+            "hits": sum(cache.hits for cache in caches),
+            "misses": sum(cache.misses for cache in caches),
+            "size": len(self._by_chat_id),
+        }
+
+    def log_stats(self) -> None:
+        """
+        Пишет статистику кэша пользователей в лог.
+        """
+        logger.info(f"[Кэш пользователей] {self.stats()}")
+
+
+user_cache = UserCache()
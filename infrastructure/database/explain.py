@@ -0,0 +1,190 @@
+"""
+Вывод планов выполнения запросов репозиториев на SQL Server.
+
+Каждый метод репозитория выполняется внутри транзакции, его SQL перехватывается,
+после чего для каждого запроса печатается план (SET SHOWPLAN_TEXT ON).
+Все изменения, включая сгенерированные данные, откатываются.
+
+Использование:
+    python -m infrastructure.database.explain
+    python -m infrastructure.database.explain --seed 50000
+"""
+
+import argparse
+import asyncio
+import datetime
+import random
+import uuid
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from infrastructure.database.cache.users import user_cache
+from infrastructure.database.models import Question, User
+from infrastructure.database.repo.requests import RequestsRepo
+from infrastructure.database.setup import create_engine
+from tgbot.config import load_config
+
+STATUSES = ["open", "in_progress", "closed", "closed", "closed", "lost"]
+
+
+def seed_questions(session: AsyncSession, count: int) -> list[Question]:
+    """
+    Добавляет в сессию count синтетических вопросов и пользователей для них.
+    """
+    now = datetime.datetime.now()
+    employees = [(10**9 + i, f"Сотрудник Тестовый {i}") for i in range(max(count // 20, 1))]
+    duties = [f"Старший Тестовый {i}" for i in range(10)]
+
+    session.add_all(
+        User(ChatId=chat_id, FIO=fio, Username=f"explain_{chat_id}", Role=1)
+        for chat_id, fio in employees
+    )
+
+    questions = []
+    for i in range(count):
+        chat_id, fio = random.choice(employees)
+        start_time = now - datetime.timedelta(minutes=random.randint(0, 90 * 24 * 60))
+        status = random.choice(STATUSES)
+        questions.append(
+            Question(
+                Token=str(uuid.uuid4()),
+                TopicId=10**6 + i,
+                TopicDutyFullname=random.choice(duties) if status != "open" else None,
+                EmployeeFullname=fio,
+                EmployeeChatId=chat_id,
+                QuestionText="Тестовый вопрос",
+                StartTime=start_time,
+                EndTime=start_time + datetime.timedelta(minutes=15)
+                if status == "closed"
+                else None,
+                Status=status,
+            )
+        )
+    session.add_all(questions)
+    return questions
+
+
+def repo_calls(repo: RequestsRepo, sample: Question):
+    """
+    Вызовы методов репозиториев, планы которых нужно вывести.
+    """
+    now = datetime.datetime.now()
+    return {
+        "questions.get_active_questions": lambda: repo.questions.get_active_questions(),
+        "questions.get_question(token)": lambda: repo.questions.get_question(
+            token=sample.Token
+        ),
+        "questions.get_question(topic_id)": lambda: repo.questions.get_question(
+            topic_id=sample.TopicId
+        ),
+        "questions.has_active_question(chat_id)": lambda: repo.questions.has_active_question(
+            employee_chat_id=sample.EmployeeChatId
+        ),
+        "questions.has_active_question(fullname)": lambda: repo.questions.has_active_question(
+            employee_fullname=sample.EmployeeFullname
+        ),
+        "questions.is_question_returnable": lambda: repo.questions.is_question_returnable(
+            token=sample.Token
+        ),
+        "questions.get_questions_counts(employee)": lambda: repo.questions.get_questions_counts(
+            employee_fullname=sample.EmployeeFullname
+        ),
+        "questions.get_questions_counts(duty)": lambda: repo.questions.get_questions_counts(
+            duty_fullname="Старший Тестовый 0"
+        ),
+        "questions.get_last_questions_by_chat_id": lambda: repo.questions.get_last_questions_by_chat_id(
+            employee_chat_id=sample.EmployeeChatId
+        ),
+        "questions.get_available_to_return_questions": lambda: repo.questions.get_available_to_return_questions(),
+        "questions.get_old_question_keys": lambda: repo.questions.get_old_question_keys(
+            before=now - datetime.timedelta(days=60), limit=200
+        ),
+        "questions.get_old_question_keys(after)": lambda: repo.questions.get_old_question_keys(
+            before=now - datetime.timedelta(days=60),
+            limit=200,
+            after=(sample.StartTime, sample.Token),
+        ),
+        "questions.claim": lambda: repo.questions.claim(
+            token=sample.Token, duty_fullname="Старший Тестовый 0"
+        ),
+        "questions.close": lambda: repo.questions.close(token=sample.Token, end_time=now),
+        "users.get_user(user_id)": lambda: repo.users.get_user(
+            user_id=sample.EmployeeChatId
+        ),
+        "users.get_user(fullname)": lambda: repo.users.get_user(
+            fullname=sample.EmployeeFullname
+        ),
+        "users.get_users_by_ids": lambda: repo.users.get_users_by_ids(
+            [sample.EmployeeChatId, 1, 2]
+        ),
+    }
+
+
+async def explain(seed: int) -> None:
+    config = load_config(".env")
+    engine = create_engine(config.db, db_name=config.db.main_db)
+
+    captured: list[tuple[str, tuple]] = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not statement.startswith("SET SHOWPLAN"):
+            captured.append((statement, parameters))
+
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        session = AsyncSession(
+            bind=connection, join_transaction_mode="create_savepoint"
+        )
+        repo = RequestsRepo(session)
+
+        try:
+            if seed:
+                questions = seed_questions(session, seed)
+                await session.flush()
+                sample = random.choice(questions)
+                print(f"Добавлено тестовых вопросов: {seed}")
+            else:
+                sample = (await repo.questions.get_active_questions() or [None])[0]
+                if sample is None:
+                    print("В БД нет активных вопросов, используй --seed")
+                    return
+
+            plans: dict[str, list[tuple[str, tuple]]] = {}
+            for name, call in repo_calls(repo, sample).items():
+                user_cache.clear()
+                captured.clear()
+                await call()
+                plans[name] = list(captured)
+
+            await connection.exec_driver_sql("SET SHOWPLAN_TEXT ON")
+            for name, statements in plans.items():
+                print(f"\n===== {name} =====")
+                for statement, parameters in statements:
+                    print(statement)
+                    result = await connection.exec_driver_sql(statement, parameters)
+                    for row in result.fetchall():
+                        print(row[0])
+            await connection.exec_driver_sql("SET SHOWPLAN_TEXT OFF")
+        finally:
+            await session.close()
+            await transaction.rollback()
+
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Количество синтетических вопросов, добавляемых перед построением планов",
+    )
+    args = parser.parse_args()
+    asyncio.run(explain(args.seed))
+
+
+if __name__ == "__main__":
+    main()
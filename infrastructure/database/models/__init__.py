@@ -1,3 +1,4 @@
 from .base import Base
 from .user import User
-from .question import Question
\ No newline at end of file
+from .question import Question
+from .topic_pool import PooledTopic
@@ -2,7 +2,7 @@ import datetime
 from typing import Optional
 from datetime import date
 
-from sqlalchemy import BIGINT, String, Boolean, Integer, Date, DateTime
+from sqlalchemy import BIGINT, String, Boolean, Integer, Date, DateTime, Index
 from sqlalchemy import Unicode
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -22,6 +22,8 @@ class Question(Base, TableNameMixin):
         QuestionText (Mapped[str]): Текст вопроса.
         StartTime (Mapped[Optional[date]]): Время начала вопроса.
         EndTime (Mapped[Optional[date]]): Время окончания вопроса.
+        Status (Mapped[Optional[str]]): Статус вопроса.
+        LastActivity (Mapped[Optional[date]]): Время последней активности в вопросе.
 
     Methods:
         __repr__(): Returns a string representation of the Question object.
@@ -36,13 +38,43 @@ class Question(Base, TableNameMixin):
 
     Token: Mapped[str] = mapped_column(String(255), primary_key=True)
     TopicId: Mapped[int] = mapped_column(Integer, nullable=False)
-    TopicDutyFullname: Mapped[str] = mapped_column(Unicode)
-    EmployeeFullname: Mapped[str] = mapped_column(Unicode, nullable=False)
+    TopicDutyFullname: Mapped[str] = mapped_column(Unicode(255))
+    EmployeeFullname: Mapped[str] = mapped_column(Unicode(255), nullable=False)
     EmployeeChatId: Mapped[int] = mapped_column(BIGINT, nullable=False)
     QuestionText: Mapped[str] = mapped_column(Unicode, nullable=False)
     StartTime: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     EndTime: Mapped[Optional[datetime]] = mapped_column(DateTime)
-    Status: Mapped[Optional[str]] = mapped_column(Unicode, nullable=True)
+    Status: Mapped[Optional[str]] = mapped_column(Unicode(32), nullable=True)
+    LastActivity: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
 
     def __repr__(self):
-        return f"<Question {self.Token} {self.TopicId} {self.TopicDutyFullname} {self.EmployeeFullname} {self.EmployeeChatId} {self.QuestionText} {self.StartTime} {self.EndTime} {self.Status}>"
\ No newline at end of file
+        return f"<Question {self.Token} {self.TopicId} {self.TopicDutyFullname} {self.EmployeeFullname} {self.EmployeeChatId} {self.QuestionText} {self.StartTime} {self.EndTime} {self.Status}>"
+
+
+# Индексы под запросы QuestionsRepo, создаются миграцией 0001
+Index(
+    "IX_BotHelpQuestions_Status_EmployeeChatId",
+    Question.Status,
+    Question.EmployeeChatId,
+    mssql_include=["TopicId"],
+)
+Index(
+    "IX_BotHelpQuestions_EmployeeChatId_Status_EndTime",
+    Question.EmployeeChatId,
+    Question.Status,
+    Question.EndTime.desc(),
+)
+Index("IX_BotHelpQuestions_Status_EndTime", Question.Status, Question.EndTime.desc())
+Index("IX_BotHelpQuestions_TopicId", Question.TopicId)
+Index(
+    "IX_BotHelpQuestions_EmployeeFullname_StartTime",
+    Question.EmployeeFullname,
+    Question.StartTime,
+    mssql_include=["Status"],
+)
+Index(
+    "IX_BotHelpQuestions_TopicDutyFullname_StartTime",
+    Question.TopicDutyFullname,
+    Question.StartTime,
+)
+Index("IX_BotHelpQuestions_StartTime", Question.StartTime)
@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from sqlalchemy import BIGINT, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base, TableNameMixin
+
+
+class PooledTopic(Base, TableNameMixin):
+    """
+    Класс, представляющий свободную тему форума из пула тем.
+
+    Attributes:
+        TopicId (Mapped[int]): ID свободной темы (первичный ключ).
+        CreatedAt (Mapped[datetime]): Время создания темы.
+
+    Inherited Attributes:
+        Inherits from Base and TableNameMixin classes, which provide additional attributes and functionality.
+    """
+    __tablename__ = 'BotHelpTopicPool'
+
+    TopicId: Mapped[int] = mapped_column(BIGINT, primary_key=True, autoincrement=False)
+    CreatedAt: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<PooledTopic {self.TopicId} {self.CreatedAt}>"
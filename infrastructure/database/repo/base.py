@@ -1,10 +1,30 @@
+from typing import Callable
+
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+AFTER_COMMIT_HOOKS = "after_commit_hooks"
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit_hooks(session: Session) -> None:
+    for hook in session.info.pop(AFTER_COMMIT_HOOKS, []):
+        hook()
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_after_commit_hooks(session: Session) -> None:
+    session.info.pop(AFTER_COMMIT_HOOKS, None)
 
 
 class BaseRepo:
     """
     A class representing a base repository for handling database operations.
 
+    Repositories only flush their changes. The transaction is committed once per unit of work
+    by the owner of the session (DatabaseMiddleware for updates, the caller for background jobs).
+
     Attributes:
         session (AsyncSession): The database session used by the repository.
 
@@ -12,3 +32,12 @@ class BaseRepo:
 
     def __init__(self, session):
         self.session: AsyncSession = session
+
+    def after_commit(self, hook: Callable[[], None]) -> None:
+        """
+        Register a callback to run after the current transaction is committed.
+        Callbacks are dropped if the transaction is rolled back.
+
+        :param hook: Synchronous callback without arguments.
+        """
+        self.session.info.setdefault(AFTER_COMMIT_HOOKS, []).append(hook)
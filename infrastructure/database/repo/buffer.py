@@ -1,18 +1,60 @@
+from typing import Iterable
+
 from sqlalchemy import select
 
+from infrastructure.database.cache.schedule import WorkSchedule, work_schedules
 from infrastructure.database.models.buffer import Buffer
 from infrastructure.database.repo.base import BaseRepo
 
 
 class BufferRepo(BaseRepo):
+    async def get_work_schedules(self, divisions: Iterable[str]) -> dict[str, WorkSchedule]:
+        """
+        Получение графиков работающих сегодня по направлениям
+
+        Графики, которых нет в кэше, загружаются одним запросом
+        """
+        schedules = {}
+        missing = set()
+        for division in set(divisions):
+            schedule = work_schedules.get(division)
+            if schedule is None:
+                missing.add(division)
+            else:
+                schedules[division] = schedule
+
+        if missing:
+            query = select(Buffer.DataName, Buffer.Data).where(
+                Buffer.DataName.in_([f"Working{division}" for division in missing])
+            )
+            result = await self.session.execute(query)
+            buffer_data = {data_name: data for data_name, data in result.all()}
+
+            for division in missing:
+                schedules[division] = work_schedules.put(
+                    division, buffer_data.get(f"Working{division}")
+                )
+
+        return schedules
+
     async def is_user_working_today(self, fio: str, division: str) -> bool:
         """
         Проверка работает ли пользователь сегодня
         """
+        schedules = await self.get_work_schedules([division])
+        return schedules[division].is_working(fio)
 
-        query = select(Buffer.Data).where(Buffer.DataName == f"Working{division}")
+    async def count_working_today(self, users: Iterable[tuple[str, str]]) -> int:
+        """
+        Подсчет работающих сегодня пользователей
 
-        result = await self.session.execute(query)
-        buffer_data = result.scalar_one_or_none()
+        Args:
+            users: Пары (ФИО, направление)
+
+        Returns:
+            Количество работающих сегодня пользователей
+        """
+        users = list(users)
+        schedules = await self.get_work_schedules(division for _, division in users)
 
-        return fio in buffer_data
\ No newline at end of file
+        return sum(1 for fio, division in users if schedules[division].is_working(fio))
@@ -2,8 +2,13 @@ import uuid
 from datetime import date, datetime, timedelta
 from typing import Optional, Sequence
 
-from sqlalchemy import and_, func, or_, select
+from sqlalchemy import Row, and_, case, delete, func, or_, select, update
 
+from infrastructure.database.cache.active_questions import (
+    ACTIVE_STATUSES,
+    active_questions,
+)
+from infrastructure.database.cache.stats import question_counters
 from infrastructure.database.models.question import Question
 from infrastructure.database.repo.base import BaseRepo
 
@@ -41,66 +46,159 @@ class QuestionsRepo(BaseRepo):
         )
 
         self.session.add(question)
-        await self.session.commit()
-        await self.session.refresh(question)
+        await self.session.flush()
+        self.after_commit(lambda: active_questions.put(question))
+        self.after_commit(
+            lambda: question_counters.bump("employee", employee_fullname, start_time)
+        )
 
         return question
 
-    async def update_question_end(self, token: str, end_time: date) -> Optional[Question]:
+    async def _transition(
+        self, token: str, from_statuses: Sequence[str], *conditions, **values
+    ) -> Optional[Question]:
         """
-        Обновляет дату окончания вопроса.
+        Атомарно переводит вопрос в новое состояние одним условным UPDATE с OUTPUT.
+
+        Обновление применяется только если текущий статус вопроса входит в from_statuses
+        и выполнены дополнительные условия, поэтому два параллельных перехода не могут
+        примениться к одному вопросу одновременно.
 
         Args:
             token (str): Токен вопроса
-            end_time (date): Дата окончания вопроса
+            from_statuses (Sequence[str]): Статусы, из которых разрешен переход
+            *conditions: Дополнительные условия на текущее состояние вопроса
+            **values: Новые значения полей вопроса
 
         Returns:
-            Question: Обновленный объект вопроса или None если не найден
+            Question: Обновленный объект вопроса или None если переход не применен
         """
-        question = await self.session.get(Question, token)
+        stmt = (
+            update(Question)
+            .where(
+                Question.Token == token,
+                Question.Status.in_(from_statuses),
+                *conditions,
+            )
+            .values(**values)
+            .returning(Question)
+            .execution_options(populate_existing=True)
+        )
+        result = await self.session.execute(stmt)
+        question = result.scalar_one_or_none()
+
         if question:
-            question.EndTime = end_time
-            await self.session.commit()
-            await self.session.refresh(question)
+            self.after_commit(lambda: active_questions.put(question))
         return question
 
+    async def move_to_topic(self, token: str, topic_id: int) -> Optional[Question]:
+        """
+        Переносит активный вопрос в другую тему форума.
 
-    async def update_question_status(self, token: str, status: str) -> Optional[Question]:
+        Args:
+            token (str): Токен вопроса
+            topic_id (int): ID новой темы
+
+        Returns:
+            Question: Обновленный объект вопроса или None если вопрос не активен
+        """
+        return await self._transition(token, ACTIVE_STATUSES, TopicId=topic_id)
+
+    async def claim(self, token: str, duty_fullname: str) -> Optional[Question]:
         """
-        Обновляет качество вопроса.
+        Берет свободный открытый вопрос в работу.
 
         Args:
             token (str): Токен вопроса
-            status (str): Статус вопроса
+            duty_fullname (str): ФИО старшего, берущего вопрос
 
         Returns:
-            Question: Обновленный объект вопроса или None если не найден
+            Question: Обновленный объект вопроса или None если вопрос уже занят или закрыт
         """
-        question = await self.session.get(Question, token)
+        question = await self._transition(
+            token,
+            ["open"],
+            Question.TopicDutyFullname.is_(None),
+            TopicDutyFullname=duty_fullname,
+            Status="in_progress",
+        )
         if question:
-            question.Status = status
-            await self.session.commit()
-            await self.session.refresh(question)
+            self.after_commit(
+                lambda: question_counters.bump("duty", duty_fullname, question.StartTime)
+            )
         return question
 
-    async def update_question_duty(self, token: str, topic_duty: Optional[str]) -> Optional[Question]:
+    async def release(self, token: str, duty_fullname: str = None) -> Optional[Question]:
         """
-        Обновляет ответственного по вопросу.
+        Освобождает активный вопрос от ответственного.
 
         Args:
             token (str): Токен вопроса
-            topic_duty (str): Ответственный за вопрос
+            duty_fullname (str, optional): ФИО старшего, который должен владеть вопросом
 
         Returns:
-            Question: Обновленный объект вопроса или None если не найден
+            Question: Обновленный объект вопроса или None если вопрос не активен или принадлежит другому старшему
         """
-        question = await self.session.get(Question, token)
-        if question:
-            question.TopicDutyFullname = topic_duty
-            await self.session.commit()
-            await self.session.refresh(question)
+        conditions = []
+        if duty_fullname:
+            conditions.append(Question.TopicDutyFullname == duty_fullname)
+
+        question = await self._transition(
+            token,
+            ACTIVE_STATUSES,
+            *conditions,
+            TopicDutyFullname=None,
+            Status="open",
+        )
+        if question and duty_fullname:
+            self.after_commit(
+                lambda: question_counters.bump(
+                    "duty", duty_fullname, question.StartTime, delta=-1
+                )
+            )
+        elif question:
+            # Прежний ответственный неизвестен, сбрасываем счетчики старших
+            self.after_commit(lambda: question_counters.invalidate(role="duty"))
         return question
 
+    async def close(
+        self, token: str, end_time: datetime, duty_fullname: str = None
+    ) -> Optional[Question]:
+        """
+        Закрывает активный вопрос.
+
+        Args:
+            token (str): Токен вопроса
+            end_time (datetime): Время закрытия вопроса
+            duty_fullname (str, optional): ФИО старшего, который должен владеть вопросом
+
+        Returns:
+            Question: Обновленный объект вопроса или None если вопрос уже закрыт или принадлежит другому старшему
+        """
+        conditions = []
+        if duty_fullname:
+            conditions.append(Question.TopicDutyFullname == duty_fullname)
+
+        return await self._transition(
+            token,
+            ACTIVE_STATUSES,
+            *conditions,
+            Status="closed",
+            EndTime=end_time,
+        )
+
+    async def reopen(self, token: str) -> Optional[Question]:
+        """
+        Переоткрывает закрытый вопрос.
+
+        Args:
+            token (str): Токен вопроса
+
+        Returns:
+            Question: Обновленный объект вопроса или None если вопрос не закрыт
+        """
+        return await self._transition(token, ["closed"], Status="open")
+
     async def get_question(self, token: str = None, topic_id: int = None) -> Optional[Question]:
         """
         Получает вопрос по токену или идентификатору топика.
@@ -138,82 +236,58 @@ class QuestionsRepo(BaseRepo):
         result = await self.session.execute(stmt)
         return result.scalars().all()
 
-    async def get_questions_count_today(self, employee_fullname: str = None, duty_fullname: str = None) -> int:
+    async def get_questions_counts(
+        self, employee_fullname: str = None, duty_fullname: str = None
+    ) -> tuple[int, int]:
         """
-        Получает количество вопросов специалиста или старшего за сегодня.
+        Получает количество вопросов специалиста или старшего за сегодня и за текущий месяц одним запросом.
 
         Args:
             employee_fullname (str): ФИО специалиста
             duty_fullname (str): ФИО старшего
 
         Returns:
-            int: Количество вопросов за сегодня
+            tuple[int, int]: Количество вопросов за сегодня и за текущий месяц
         """
-        today = datetime.now().date()
-        tomorrow = today + timedelta(days=1)
-
         if employee_fullname:
-            stmt = select(func.count(Question.Token)).where(
-                and_(
-                    Question.EmployeeFullname == employee_fullname,
-                    Question.StartTime >= today,
-                    Question.StartTime < tomorrow
-                )
-            )
+            role, fullname = "employee", employee_fullname
+            person_filter = Question.EmployeeFullname == employee_fullname
         else:
-            stmt = select(func.count(Question.Token)).where(
-                and_(
-                    Question.TopicDutyFullname == duty_fullname,
-                    Question.StartTime >= today,
-                    Question.StartTime < tomorrow
-                )
-            )
-        result = await self.session.execute(stmt)
-        return result.scalar() or 0
+            role, fullname = "duty", duty_fullname
+            person_filter = Question.TopicDutyFullname == duty_fullname
 
-    async def get_questions_count_last_month(self, employee_fullname: str = None, duty_fullname: str = None) -> int:
-        """
-        Получает количество вопросов специалиста или старшего за текущий месяц.
+        cached_counts = question_counters.get(role, fullname)
+        if cached_counts is not None:
+            return cached_counts
 
-        Args:
-            employee_fullname (str): ФИО специалиста
-            duty_fullname (str): ФИО старшего
-
-        Returns:
-            int: Количество вопросов за текущий месяц
-        """
-        today = datetime.now()
-        # Получаем первый день текущего месяца
-        first_day_current_month = datetime(today.year, today.month, 1).date()
-
-        # Получаем первый день следующего месяца
-        if today.month == 12:
-            next_month = 1
-            next_year = today.year + 1
-        else:
-            next_month = today.month + 1
-            next_year = today.year
-
-        first_day_next_month = datetime(next_year, next_month, 1).date()
-
-        if employee_fullname:
-            stmt = select(func.count(Question.Token)).where(
-                and_(
-                    Question.EmployeeFullname == employee_fullname,
-                    Question.StartTime >= first_day_current_month,
-                    Question.StartTime < first_day_next_month
-                )
-            )
-        else:
-            stmt = select(func.count(Question.Token)).where(
-                and_(
-                    Question.TopicDutyFullname == duty_fullname,
-                    Question.StartTime >= first_day_current_month,
-                    Question.StartTime < first_day_next_month
+        today = datetime.now().date()
+        tomorrow = today + timedelta(days=1)
+        first_day_current_month = today.replace(day=1)
+        first_day_next_month = (first_day_current_month + timedelta(days=32)).replace(day=1)
+
+        stmt = select(
+            func.count(
+                case(
+                    (
+                        and_(Question.StartTime >= today, Question.StartTime < tomorrow),
+                        Question.Token,
+                    )
                 )
+            ),
+            func.count(Question.Token),
+        ).where(
+            and_(
+                person_filter,
+                Question.StartTime >= first_day_current_month,
+                Question.StartTime < first_day_next_month,
             )
+        )
         result = await self.session.execute(stmt)
-        return result.scalar() or 0
+        today_count, month_count = result.one()
+        today_count, month_count = today_count or 0, month_count or 0
+
+        question_counters.seed(role, fullname, today_count, month_count)
+        return today_count, month_count
 
     async def get_questions_by_employee_chat_id(self, employee_chat_id: int) -> Sequence[Question]:
         """
@@ -229,6 +303,21 @@ class QuestionsRepo(BaseRepo):
         result = await self.session.execute(stmt)
         return result.scalars().all()
 
+    async def get_employee_chat_ids(self) -> Sequence[int]:
+        """
+        Получает Chat ID всех сотрудников, когда-либо задававших вопросы.
+
+        Returns:
+            Sequence[int]: Список уникальных Chat ID сотрудников
+        """
+        stmt = (
+            select(Question.EmployeeChatId)
+            .where(Question.EmployeeChatId.is_not(None))
+            .distinct()
+        )
+        result = await self.session.execute(stmt)
+        return result.scalars().all()
+
     async def get_active_questions(self) -> Sequence[Question]:
         """
         Получает все активные вопросы (со статусов open или in_progress).
@@ -236,28 +325,86 @@ class QuestionsRepo(BaseRepo):
         Returns:
             Sequence[Question]: Список активных вопросов
         """
-        stmt = select(Question).where(
-            or_(Question.Status == "open", Question.Status == "in_progress")
-        )
+        stmt = select(Question).where(Question.Status.in_(ACTIVE_STATUSES))
         result = await self.session.execute(stmt)
         return result.scalars().all()
 
-    async def get_old_questions(self) -> Sequence[Question]:
+    async def set_last_activity(self, activity: dict[str, datetime]) -> None:
         """
-        Получает вопросы старше 2 месяцев.
+        Сохраняет время последней активности для нескольких вопросов одним пакетом.
 
-        Returns:
-            Sequence[Dialog]: Список вопросов старше 2 месяцев
+        Args:
+            activity (dict[str, datetime]): Время последней активности по токенам вопросов
         """
-        from datetime import datetime, timedelta
+        if not activity:
+            return
+
+        await self.session.execute(
+            update(Question),
+            [
+                {"Token": token, "LastActivity": last_activity}
+                for token, last_activity in activity.items()
+            ],
+        )
 
-        # Считаем дату два месяца назад
-        today = datetime.now()
-        two_months_ago = today - timedelta(days=60)  # Примерно 2 месяца
+    async def get_old_question_keys(
+        self,
+        before: datetime,
+        limit: int,
+        after: Optional[tuple[datetime, str]] = None,
+    ) -> Sequence[Row[tuple[str, int, datetime]]]:
+        """
+        Получает порцию ключей вопросов, начатых раньше указанной даты, в порядке (StartTime, Token).
 
-        stmt = select(Question).where(Question.StartTime < two_months_ago)
+        Args:
+            before (datetime): Граница даты начала вопроса
+            limit (int): Размер порции
+            after (tuple[datetime, str], optional): (StartTime, Token) последнего вопроса предыдущей порции
+
+        Returns:
+            Sequence[Row]: Строки (Token, TopicId, StartTime)
+        """
+        stmt = select(Question.Token, Question.TopicId, Question.StartTime).where(
+            Question.StartTime < before
+        )
+        if after:
+            last_start_time, last_token = after
+            stmt = stmt.where(
+                or_(
+                    Question.StartTime > last_start_time,
+                    and_(
+                        Question.StartTime == last_start_time,
+                        Question.Token > last_token,
+                    ),
+                )
+            )
+
+        stmt = stmt.order_by(Question.StartTime, Question.Token).limit(limit)
         result = await self.session.execute(stmt)
-        return result.scalars().all()
+        return result.all()
+
+    async def delete_questions(self, tokens: Sequence[str]) -> int:
+        """
+        Удаляет вопросы по токенам одним запросом.
+
+        Args:
+            tokens (Sequence[str]): Токены вопросов для удаления
+
+        Returns:
+            int: Количество удаленных вопросов
+        """
+        if not tokens:
+            return 0
+
+        result = await self.session.execute(
+            delete(Question)
+            .where(Question.Token.in_(tokens))
+            .execution_options(synchronize_session=False)
+        )
+        self.after_commit(
+            lambda: [active_questions.discard(token) for token in tokens]
+        )
+        return result.rowcount
 
     async def get_last_questions_by_chat_id(self, employee_chat_id: int, limit: int = 5) -> Sequence[Question]:
         """
@@ -306,6 +453,60 @@ class QuestionsRepo(BaseRepo):
         result = await self.session.execute(stmt)
         return result.scalars().all()
 
+    async def has_active_question(
+        self, employee_fullname: str = None, employee_chat_id: int = None
+    ) -> bool:
+        """
+        Проверяет наличие активного вопроса (со статусом open или in_progress) у сотрудника.
+
+        Args:
+            employee_fullname (str): ФИО сотрудника
+            employee_chat_id (int): Chat ID сотрудника
+
+        Returns:
+            bool: True если у сотрудника есть активный вопрос
+        """
+        if employee_chat_id:
+            employee_filter = Question.EmployeeChatId == employee_chat_id
+        else:
+            employee_filter = Question.EmployeeFullname == employee_fullname
+
+        stmt = (
+            select(Question.Token)
+            .where(and_(employee_filter, Question.Status.in_(ACTIVE_STATUSES)))
+            .limit(1)
+        )
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none() is not None
+
+    async def is_question_returnable(self, token: str) -> bool:
+        """
+        Проверяет, можно ли вернуть вопрос в работу (закрыт не более 24 часов назад).
+
+        Args:
+            token (str): Токен вопроса
+
+        Returns:
+            bool: True если вопрос доступен для возврата
+        """
+        twenty_four_hours_ago = datetime.now() - timedelta(hours=24)
+
+        stmt = (
+            select(Question.Token)
+            .where(
+                and_(
+                    Question.Token == token,
+                    Question.QuestionText != None,
+                    Question.Status == "closed",
+                    Question.EndTime.is_not(None),
+                    Question.EndTime >= twenty_four_hours_ago,
+                )
+            )
+            .limit(1)
+        )
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none() is not None
+
     async def delete_question(self, token: str = None, dialogs: Sequence[Question] = None) -> dict:
         """
         Удаляет вопрос(ы) из базы данных по токену или последовательности вопросов.
@@ -356,10 +557,17 @@ class QuestionsRepo(BaseRepo):
                 await self.session.delete(question)
                 deleted_count = 1
                 total_count = 1
+                deleted_tokens = [token]
+                self.after_commit(
+                    lambda: question_counters.invalidate(
+                        "employee", question.EmployeeFullname
+                    )
+                )
 
             else:
                 # Multiple dialogs deletion
                 total_count = len(dialogs)
+                deleted_tokens = []
 
                 for question in dialogs:
                     try:
@@ -367,11 +575,18 @@ class QuestionsRepo(BaseRepo):
                         await self.session.refresh(question)
                         await self.session.delete(question)
                         deleted_count += 1
+                        deleted_tokens.append(question.Token)
                     except Exception as e:
                         errors.append(f"Error deleting question {question.Token}: {str(e)}")
 
-            # Commit all deletions
-            await self.session.commit()
+            # Flush all deletions, they are committed with the unit of work
+            await self.session.flush()
+            for deleted_token in deleted_tokens:
+                self.after_commit(
+                    lambda deleted_token=deleted_token: active_questions.discard(
+                        deleted_token
+                    )
+                )
 
             return {
                 "success": deleted_count > 0,
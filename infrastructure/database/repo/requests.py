@@ -4,6 +4,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from infrastructure.database.repo.buffer import BufferRepo
 from infrastructure.database.repo.questions import QuestionsRepo
+from infrastructure.database.repo.topic_pool import TopicPoolRepo
 from infrastructure.database.repo.users import UserRepo
 
 
@@ -17,6 +18,15 @@ class RequestsRepo:
 
     session: AsyncSession
 
+    async def commit(self) -> None:
+        """
+        Commits the current unit of work.
+
+        DatabaseMiddleware commits once after the handler returns, so handlers only need this
+        when the changes must be durable before calling Telegram.
+        """
+        await self.session.commit()
+
     @property
     def users(self) -> UserRepo:
         """
@@ -37,3 +47,10 @@ class RequestsRepo:
         The BufferRepo repository sessions are required to manage buffer operations.
         """
         return BufferRepo(self.session)
+
+    @property
+    def topic_pool(self) -> TopicPoolRepo:
+        """
+        The TopicPoolRepo repository sessions are required to manage pre-created forum topics.
+        """
+        return TopicPoolRepo(self.session)
@@ -0,0 +1,44 @@
+from datetime import datetime
+from typing import Iterable, Sequence
+
+from sqlalchemy import delete, select
+
+from infrastructure.database.models.topic_pool import PooledTopic
+from infrastructure.database.repo.base import BaseRepo
+
+
+class TopicPoolRepo(BaseRepo):
+    async def get_topic_ids(self) -> Sequence[int]:
+        """
+        Получает ID всех свободных тем пула в порядке создания.
+
+        Returns:
+            Sequence[int]: Список ID тем
+        """
+        stmt = select(PooledTopic.TopicId).order_by(PooledTopic.CreatedAt)
+        result = await self.session.execute(stmt)
+        return result.scalars().all()
+
+    async def add_topic(self, topic_id: int) -> None:
+        """
+        Сохраняет свободную тему пула.
+
+        Args:
+            topic_id (int): ID темы
+        """
+        self.session.add(PooledTopic(TopicId=topic_id, CreatedAt=datetime.now()))
+        await self.session.flush()
+
+    async def remove_topics(self, topic_ids: Iterable[int]) -> None:
+        """
+        Удаляет темы из пула, например когда тема занята вопросом.
+
+        Args:
+            topic_ids (Iterable[int]): ID тем
+        """
+        topic_ids = list(topic_ids)
+        if not topic_ids:
+            return
+        await self.session.execute(
+            delete(PooledTopic).where(PooledTopic.TopicId.in_(topic_ids))
+        )
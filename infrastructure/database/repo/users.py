@@ -1,9 +1,11 @@
 import logging
-from typing import Optional, List, Sequence
+from typing import Iterable, Optional, List, Sequence
 
 from sqlalchemy import select, and_
 from sqlalchemy.exc import SQLAlchemyError
 
+from infrastructure.database.cache.lru import MISSING
+from infrastructure.database.cache.users import user_cache
 from infrastructure.database.models.user import User
 from infrastructure.database.repo.base import BaseRepo
 from tgbot.services.logger import setup_logging
@@ -11,6 +13,9 @@ from tgbot.services.logger import setup_logging
 setup_logging()
 logger = logging.getLogger(__name__)
 
+# SQL Server ограничивает запрос 2100 параметрами
+IN_CHUNK_SIZE = 2000
+
 class UserRepo(BaseRepo):
     async def get_user(
             self,
@@ -31,6 +36,16 @@ class UserRepo(BaseRepo):
         Returns:
             Объект User или ничего
         """
+        # Поиск по одному ключу обслуживается кэшем снимков пользователей
+        lookup_keys = [key for key in (user_id, username, fullname) if key]
+        cacheable = not email and len(lookup_keys) == 1
+        if cacheable:
+            cached_user = user_cache.get(
+                user_id=user_id, username=username, fullname=fullname
+            )
+            if cached_user is not MISSING:
+                return cached_user
+
         filters = []
 
         if user_id:
@@ -50,11 +65,17 @@ class UserRepo(BaseRepo):
 
         try:
             result = await self.session.execute(query)
-            return result.scalar_one_or_none()
+            user = result.scalar_one_or_none()
         except SQLAlchemyError as e:
             logger.error(f"[БД] Ошибка получения пользователя: {e}")
             return None
 
+        if user is not None:
+            # Снимок отвязываем от сессии, чтобы его можно было отдавать другим апдейтам
+            self.session.expunge(user)
+            user_cache.put(user)
+        return user
+
     async def get_users_by_fio_parts(
             self,
             fullname: str,
@@ -88,4 +109,65 @@ class UserRepo(BaseRepo):
             return result.scalars().all()
         except SQLAlchemyError as e:
             logger.error(f"[БД] Ошибка получения пользователей по ФИО: {e}")
-            return []
\ No newline at end of file
+            return []
+
+    async def get_users_by_ids(self, user_ids: Iterable[int]) -> dict[int, User]:
+        """
+        Поиск пользователей по списку идентификаторов Telegram одним запросом
+
+        Args:
+            user_ids: Идентификаторы пользователей Telegram
+
+        Returns:
+            Словарь {ChatId: User} для найденных пользователей
+        """
+        users = await self._get_users_by(
+            User.ChatId, user_ids, lambda key: user_cache.get(user_id=key)
+        )
+        return {user.ChatId: user for user in users}
+
+    async def get_users_by_fullnames(self, fullnames: Iterable[str]) -> dict[str, User]:
+        """
+        Поиск пользователей по списку ФИО одним запросом
+
+        Args:
+            fullnames: ФИО пользователей в БД
+
+        Returns:
+            Словарь {FIO: User} для найденных пользователей
+        """
+        users = await self._get_users_by(
+            User.FIO, fullnames, lambda key: user_cache.get(fullname=key)
+        )
+        return {user.FIO: user for user in users}
+
+    async def _get_users_by(self, column, keys: Iterable, from_cache) -> List[User]:
+        """
+        Поиск пользователей по значениям колонки: сначала в кэше, остальные - запросом IN (...) пачками
+        """
+        users = []
+        missing = []
+        for key in dict.fromkeys(key for key in keys if key):
+            cached_user = from_cache(key)
+            if cached_user is MISSING:
+                missing.append(key)
+            elif cached_user is not None:
+                users.append(cached_user)
+
+        for start in range(0, len(missing), IN_CHUNK_SIZE):
+            chunk = missing[start : start + IN_CHUNK_SIZE]
+            query = select(User).where(column.in_(chunk))
+
+            try:
+                result = await self.session.execute(query)
+                found_users = result.scalars().all()
+            except SQLAlchemyError as e:
+                logger.error(f"[БД] Ошибка получения списка пользователей: {e}")
+                continue
+
+            for user in found_users:
+                self.session.expunge(user)
+                user_cache.put(user)
+                users.append(user)
+
+        return users
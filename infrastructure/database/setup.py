@@ -1,7 +1,13 @@
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from alembic.config import Config as AlembicConfig
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker
 
 from tgbot.config import DbConfig
 
+# База общая с другими ботами, поэтому версия миграций хранится в отдельной таблице
+VERSION_TABLE = "BotHelpAlembicVersion"
+
 
 def create_engine(db: DbConfig, db_name:str, echo=False):
     engine = create_async_engine(
@@ -18,3 +24,28 @@ def create_engine(db: DbConfig, db_name:str, echo=False):
 def create_session_pool(engine):
     session_pool = async_sessionmaker(bind=engine, expire_on_commit=False, )
     return session_pool
+
+
+async def check_schema_version(engine: AsyncEngine, alembic_ini: str = "alembic.ini") -> None:
+    """
+    Проверка, что к базе применены все миграции из infrastructure/migrations.
+
+    Модели ссылаются на таблицы и колонки из миграций, без них бот падал бы на первом запросе.
+
+    Raises:
+        RuntimeError: Версия схемы в базе не совпадает с последней миграцией
+    """
+    head = ScriptDirectory.from_config(AlembicConfig(alembic_ini)).get_current_head()
+
+    async with engine.connect() as connection:
+        current = await connection.run_sync(
+            lambda sync_connection: MigrationContext.configure(
+                sync_connection, opts={"version_table": VERSION_TABLE}
+            ).get_current_revision()
+        )
+
+    if current != head:
+        raise RuntimeError(
+            f"Database schema is at revision {current}, expected {head}. "
+            "Run `uv run alembic upgrade head` before starting the bot"
+        )
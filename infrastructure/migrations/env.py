@@ -0,0 +1,99 @@
+import asyncio
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import pool
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import async_engine_from_config
+
+from infrastructure.database.models import Base
+from infrastructure.database.setup import VERSION_TABLE
+from tgbot.config import load_config
+
+# this is the Alembic Config object, which provides
+# access to the values within the .ini file in use.
+config = context.config
+
+# Interpret the config file for Python logging.
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+bot_config = load_config(".env")
+config.set_main_option(
+    "sqlalchemy.url",
+    bot_config.db.construct_sqlalchemy_url()
+    .render_as_string(hide_password=False)
+    .replace("%", "%%"),
+)
+
+target_metadata = Base.metadata
+
+# Таблицы других ботов: модели нужны для чтения, но схемой этих таблиц бот не управляет
+SHARED_TABLES = {"RegisteredUsers", "BufferForBot"}
+
+
+def include_name(name, type_, parent_names) -> bool:
+    """
+    Ограничивает автогенерацию таблицами, описанными в моделях бота и принадлежащими ему.
+    """
+    if type_ == "table":
+        return name in target_metadata.tables and name not in SHARED_TABLES
+    return True
+
+
+def run_migrations_offline() -> None:
+    """
+    Run migrations in 'offline' mode.
+    """
+    context.configure(
+        url=config.get_main_option("sqlalchemy.url"),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        version_table=VERSION_TABLE,
+        include_name=include_name,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def do_run_migrations(connection: Connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        version_table=VERSION_TABLE,
+        include_name=include_name,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_async_migrations() -> None:
+    """
+    Create an async engine and run migrations with a connection from it.
+    """
+    connectable = async_engine_from_config(
+        config.get_section(config.config_ini_section, {}),
+        prefix="sqlalchemy.",
+        poolclass=pool.NullPool,
+    )
+
+    async with connectable.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+
+    await connectable.dispose()
+
+
+def run_migrations_online() -> None:
+    """
+    Run migrations in 'online' mode.
+    """
+    asyncio.run(run_async_migrations())
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
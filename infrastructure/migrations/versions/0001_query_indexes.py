@@ -0,0 +1,104 @@
+"""Covering indexes for BotHelpQuestions
+
+Индексы подобраны под запросы QuestionsRepo и UserRepo:
+    - (Status, EmployeeChatId) - активные вопросы, has_active_question по Chat ID
+    - (EmployeeChatId, Status, EndTime DESC) - последние закрытые вопросы сотрудника
+    - (Status, EndTime DESC) - вопросы, доступные для возврата
+    - (TopicId) - поиск вопроса по топику
+    - (EmployeeFullname, StartTime) и (TopicDutyFullname, StartTime) - статистика за день/месяц
+    - (StartTime) - очистка старых вопросов
+
+Ключевые колонки индекса не могут быть NVARCHAR(MAX), поэтому такие колонки
+перед созданием индексов ограничиваются по длине.
+
+RegisteredUsers общая с другими ботами и не входит в историю миграций этого бота,
+поэтому ни индексы, ни изменения колонок для нее здесь не создаются.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+QUESTIONS = "BotHelpQuestions"
+
+BOUNDED_COLUMNS = [
+    (QUESTIONS, "Status", 32),
+    (QUESTIONS, "EmployeeFullname", 255),
+    (QUESTIONS, "TopicDutyFullname", 255),
+]
+
+
+def _bound_max_columns() -> None:
+    """
+    Ограничивает длину NVARCHAR(MAX) колонок, используемых как ключи индексов.
+
+    Проверка выполняется на стороне сервера, поэтому работает и в offline-режиме (--sql).
+    """
+    for table, column, length in BOUNDED_COLUMNS:
+        op.execute(
+            f"""
+IF COL_LENGTH(N'{table}', N'{column}') = -1
+BEGIN
+    DECLARE @nullability NVARCHAR(8) = CASE COLUMNPROPERTY(OBJECT_ID(N'{table}'), N'{column}', 'AllowsNull')
+        WHEN 1 THEN N'NULL' ELSE N'NOT NULL' END;
+    EXEC(N'ALTER TABLE [{table}] ALTER COLUMN [{column}] NVARCHAR({length}) ' + @nullability);
+END
+"""
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _bound_max_columns()
+
+    op.create_index(
+        "IX_BotHelpQuestions_Status_EmployeeChatId",
+        QUESTIONS,
+        ["Status", "EmployeeChatId"],
+        mssql_include=["TopicId"],
+    )
+    op.create_index(
+        "IX_BotHelpQuestions_EmployeeChatId_Status_EndTime",
+        QUESTIONS,
+        ["EmployeeChatId", "Status", sa.text("[EndTime] DESC")],
+    )
+    op.create_index(
+        "IX_BotHelpQuestions_Status_EndTime",
+        QUESTIONS,
+        ["Status", sa.text("[EndTime] DESC")],
+    )
+    op.create_index("IX_BotHelpQuestions_TopicId", QUESTIONS, ["TopicId"])
+    op.create_index(
+        "IX_BotHelpQuestions_EmployeeFullname_StartTime",
+        QUESTIONS,
+        ["EmployeeFullname", "StartTime"],
+        mssql_include=["Status"],
+    )
+    op.create_index(
+        "IX_BotHelpQuestions_TopicDutyFullname_StartTime",
+        QUESTIONS,
+        ["TopicDutyFullname", "StartTime"],
+    )
+    op.create_index("IX_BotHelpQuestions_StartTime", QUESTIONS, ["StartTime"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("IX_BotHelpQuestions_StartTime", table_name=QUESTIONS)
+    op.drop_index("IX_BotHelpQuestions_TopicDutyFullname_StartTime", table_name=QUESTIONS)
+    op.drop_index("IX_BotHelpQuestions_EmployeeFullname_StartTime", table_name=QUESTIONS)
+    op.drop_index("IX_BotHelpQuestions_TopicId", table_name=QUESTIONS)
+    op.drop_index("IX_BotHelpQuestions_Status_EndTime", table_name=QUESTIONS)
+    op.drop_index("IX_BotHelpQuestions_EmployeeChatId_Status_EndTime", table_name=QUESTIONS)
+    op.drop_index("IX_BotHelpQuestions_Status_EmployeeChatId", table_name=QUESTIONS)
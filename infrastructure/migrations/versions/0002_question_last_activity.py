@@ -0,0 +1,43 @@
+"""Persist last activity of BotHelpQuestions
+
+Время последней активности нужно, чтобы после перезапуска бота восстановить
+сроки предупреждения и автозакрытия активных вопросов.
+
+У уже открытых вопросов время активности неизвестно, поэтому оно заполняется моментом
+миграции: иначе первая проверка после выкладки закрыла бы все живые диалоги старше
+срока автозакрытия.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "BotHelpQuestions", sa.Column("LastActivity", sa.DateTime(), nullable=True)
+    )
+    op.execute(
+        """
+UPDATE [BotHelpQuestions]
+SET [LastActivity] = GETDATE()
+WHERE [LastActivity] IS NULL AND [Status] IN (N'open', N'in_progress')
+"""
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("BotHelpQuestions", "LastActivity")
@@ -0,0 +1,35 @@
+"""Persist pre-created forum topics
+
+Свободные темы пула хранятся в БД, чтобы после аварийной остановки бота их можно было
+переиспользовать или удалить, а не оставлять на форуме навсегда.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "BotHelpTopicPool",
+        sa.Column("TopicId", sa.BIGINT(), autoincrement=False, nullable=False),
+        sa.Column("CreatedAt", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("TopicId"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("BotHelpTopicPool")
@@ -1,3 +1,4 @@
+import re
 from dataclasses import dataclass
 from typing import Optional, List
 
@@ -18,6 +19,26 @@ class TgBot:
         If we need to use redis.
     division : str
         Division where bot will run.
+    question_counters : bool
+        If question statistics should be served from in-memory counters (single instance only).
+    topic_pool_size : int
+        How many pre-created forum topics to keep for new questions (0 disables the pool).
+    media_group_delay : float
+        How long to wait for the next part of an album before relaying it, in seconds.
+    broadcast_state_path : str
+        Where unfinished broadcasts and blocked chats are stored (should be on a persistent volume).
+    rate_limit_global : float
+        Outgoing Bot API requests per second across all chats.
+    rate_limit_private : float
+        Messages per second to one private chat.
+    rate_limit_private_burst : int
+        How many messages to one private chat may be sent at once.
+    rate_limit_group_per_minute : float
+        Messages per minute to one group or forum.
+    rate_limit_group_burst : int
+        How many messages to one group or forum may be sent at once.
+    rate_limit_queue : int
+        How many delayed requests may wait for their turn at once.
     """
 
     token: str
@@ -30,6 +51,19 @@ class TgBot:
     activity_warn_minutes: int
     activity_close_minutes: int
 
+    question_counters: bool
+    topic_pool_size: int
+    media_group_delay: float
+
+    broadcast_state_path: str
+
+    rate_limit_global: float
+    rate_limit_private: float
+    rate_limit_private_burst: int
+    rate_limit_group_per_minute: float
+    rate_limit_group_burst: int
+    rate_limit_queue: int
+
     @staticmethod
     def from_env(env: Env):
         """
@@ -48,6 +82,19 @@ class TgBot:
         activity_warn_minutes = env.int("ACTIVITY_WARN_MINUTES")
         activity_close_minutes = env.int("ACTIVITY_CLOSE_MINUTES")
 
+        question_counters = env.bool("QUESTION_COUNTERS", False)
+        topic_pool_size = env.int("TOPIC_POOL_SIZE", 0)
+        media_group_delay = env.float("MEDIA_GROUP_DELAY", 0.5)
+
+        broadcast_state_path = env.str("BROADCAST_STATE_PATH", "broadcasts.json")
+
+        rate_limit_global = env.float("RATE_LIMIT_GLOBAL", 30)
+        rate_limit_private = env.float("RATE_LIMIT_PRIVATE", 1)
+        rate_limit_private_burst = env.int("RATE_LIMIT_PRIVATE_BURST", 3)
+        rate_limit_group_per_minute = env.float("RATE_LIMIT_GROUP_PER_MINUTE", 20)
+        rate_limit_group_burst = env.int("RATE_LIMIT_GROUP_BURST", 20)
+        rate_limit_queue = env.int("RATE_LIMIT_QUEUE", 1000)
+
         return TgBot(
             token=token,
             admin_ids=admin_ids,
@@ -56,6 +103,138 @@ class TgBot:
             activity_status=activity_status,
             activity_warn_minutes=activity_warn_minutes,
             activity_close_minutes=activity_close_minutes,
+            question_counters=question_counters,
+            topic_pool_size=topic_pool_size,
+            media_group_delay=media_group_delay,
+            broadcast_state_path=broadcast_state_path,
+            rate_limit_global=rate_limit_global,
+            rate_limit_private=rate_limit_private,
+            rate_limit_private_burst=rate_limit_private_burst,
+            rate_limit_group_per_minute=rate_limit_group_per_minute,
+            rate_limit_group_burst=rate_limit_group_burst,
+            rate_limit_queue=rate_limit_queue,
+        )
+
+
+@dataclass
+class HttpConfig:
+    """
+    Bot API HTTP session configuration class.
+
+    Attributes
+    ----------
+    limit : int
+        Maximum number of simultaneous connections.
+    limit_per_host : int
+        Maximum number of simultaneous connections to one host (0 - no limit).
+    keepalive_timeout : float
+        How long an idle connection is kept open for reuse, in seconds.
+    dns_ttl : int
+        How long resolved DNS records are cached, in seconds.
+    timeout : int
+        Default Bot API request timeout, in seconds.
+    method_timeouts : dict[str, int]
+        Request timeouts per Bot API method, e.g. sendMessage=10.
+    """
+
+    limit: int
+    limit_per_host: int
+    keepalive_timeout: float
+    dns_ttl: int
+    timeout: int
+    method_timeouts: dict[str, int]
+
+    @staticmethod
+    def from_env(env: Env):
+        """
+        Creates the HttpConfig object from environment variables.
+        """
+        limit = env.int("BOT_HTTP_LIMIT", 100)
+        limit_per_host = env.int("BOT_HTTP_LIMIT_PER_HOST", 0)
+        keepalive_timeout = env.float("BOT_HTTP_KEEPALIVE", 60)
+        dns_ttl = env.int("BOT_HTTP_DNS_TTL", 600)
+        timeout = env.int("BOT_HTTP_TIMEOUT", 60)
+        method_timeouts = env.dict("BOT_HTTP_METHOD_TIMEOUTS", subcast_values=int, default={})
+
+        return HttpConfig(
+            limit=limit,
+            limit_per_host=limit_per_host,
+            keepalive_timeout=keepalive_timeout,
+            dns_ttl=dns_ttl,
+            timeout=timeout,
+            method_timeouts=method_timeouts,
+        )
+
+
+@dataclass
+class WebhookConfig:
+    """
+    Webhook configuration class.
+
+    Attributes
+    ----------
+    use_webhook : bool
+        If updates should be received via webhook instead of long polling.
+    url : Optional[str]
+        Public base URL of the bot behind the reverse proxy, e.g. https://bot.example.com.
+    path : str
+        Path of the webhook endpoint.
+    secret : Optional[str]
+        Secret token Telegram sends in the X-Telegram-Bot-Api-Secret-Token header.
+    host : str
+        Host the aiohttp server listens on.
+    port : int
+        Port the aiohttp server listens on.
+    max_concurrency : int
+        Maximum number of updates handled at the same time by one process.
+
+    Webhook mode supports a single instance only: in-memory state and scheduler jobs are per process.
+    """
+
+    use_webhook: bool
+    url: Optional[str]
+    path: str
+    secret: Optional[str]
+    host: str
+    port: int
+    max_concurrency: int
+
+    @property
+    def webhook_url(self) -> str:
+        return f"{self.url.rstrip('/')}{self.path}"
+
+    @staticmethod
+    def from_env(env: Env):
+        """
+        Creates the WebhookConfig object from environment variables.
+        """
+        use_webhook = env.bool("USE_WEBHOOK", False)
+        url = env.str("WEBHOOK_URL", None)
+        path = env.str("WEBHOOK_PATH", "/webhook")
+        secret = env.str("WEBHOOK_SECRET", None)
+        host = env.str("WEBHOOK_HOST", "0.0.0.0")
+        port = env.int("WEBHOOK_PORT", 8080)
+        max_concurrency = env.int("WEBHOOK_MAX_CONCURRENCY", 50)
+
+        if use_webhook:
+            if not url:
+                raise ValueError("WEBHOOK_URL is required when USE_WEBHOOK=True")
+            if not secret or not re.fullmatch(r"[A-Za-z0-9_-]{1,256}", secret):
+                raise ValueError(
+                    "WEBHOOK_SECRET is required when USE_WEBHOOK=True "
+                    "(1-256 characters: A-Z, a-z, 0-9, _ and -)"
+                )
+            if max_concurrency < 1:
+                raise ValueError("WEBHOOK_MAX_CONCURRENCY must be positive")
+
+        return WebhookConfig(
+            use_webhook=use_webhook,
+            url=url,
+            path=path,
+            secret=secret,
+            host=host,
+            port=port,
+            max_concurrency=max_concurrency,
         )
 
 
@@ -182,11 +361,17 @@ class Config:
         Holds the settings specific to the database (default is None).
     redis : Optional[RedisConfig]
         Holds the settings specific to Redis (default is None).
+    webhook : Optional[WebhookConfig]
+        Holds the settings for receiving updates via webhook (default is None).
+    http : Optional[HttpConfig]
+        Holds the settings of the Bot API HTTP session (default is None).
     """
 
     tg_bot: TgBot
     db: DbConfig
     redis: Optional[RedisConfig] = None
+    webhook: Optional[WebhookConfig] = None
+    http: Optional[HttpConfig] = None
 
 
 def load_config(path: str = None) -> Config:
@@ -206,4 +391,6 @@ def load_config(path: str = None) -> Config:
         tg_bot=TgBot.from_env(env),
         db=DbConfig.from_env(env),
         # redis=RedisConfig.from_env(env),
+        webhook=WebhookConfig.from_env(env),
+        http=HttpConfig.from_env(env),
     )
@@ -2,9 +2,8 @@ import logging
 
 from aiogram.filters import BaseFilter
 from aiogram.types import Message
-from sqlalchemy import Sequence
 
-from infrastructure.database.models import Question
+from infrastructure.database.cache.active_questions import active_questions
 from infrastructure.database.repo.requests import RequestsRepo
 from tgbot.services.logger import setup_logging
 
@@ -12,18 +11,32 @@ setup_logging()
 logger = logging.getLogger(__name__)
 
 
+async def find_active_question_token(
+    employee_chat_id: int, repo: RequestsRepo
+) -> str | None:
+    """
+    Поиск токена активного вопроса сотрудника.
+
+    Отвечает из реестра активных вопросов, к БД обращается только если реестр еще не прогрет.
+    """
+    if active_questions.warmed:
+        entry = active_questions.by_employee(employee_chat_id)
+        return entry.token if entry else None
+
+    for dialog in await repo.questions.get_active_questions():
+        if dialog.EmployeeChatId == employee_chat_id:
+            return dialog.Token
+
+    return None
+
+
 class ActiveQuestion(BaseFilter):
     async def __call__(
         self, obj: Message, repo: RequestsRepo, **kwargs
     ) -> dict[str, str] | bool:
-        current_dialogs: Sequence[
-            Question
-        ] = await repo.questions.get_active_questions()
-
-        for dialog in current_dialogs:
-            if dialog.EmployeeChatId == obj.from_user.id:
-                active_dialog_token = dialog.Token
-                return {"active_dialog_token": active_dialog_token}
+        active_dialog_token = await find_active_question_token(obj.from_user.id, repo)
+        if active_dialog_token:
+            return {"active_dialog_token": active_dialog_token}
 
         return False
 
@@ -39,13 +52,11 @@ class ActiveQuestionWithCommand(BaseFilter):
             if not obj.text or not obj.text.startswith(f"/{self.command}"):
                 return False
 
-            current_dialogs: Sequence[
-                Question
-            ] = await repo.questions.get_active_questions()
-
-            for dialog in current_dialogs:
-                if dialog.EmployeeChatId == obj.from_user.id:
-                    return {"active_dialog_token": dialog.Token}
+            active_dialog_token = await find_active_question_token(
+                obj.from_user.id, repo
+            )
+            if active_dialog_token:
+                return {"active_dialog_token": active_dialog_token}
 
             return False
 
@@ -61,12 +72,10 @@ class ActiveQuestionWithReplyCommand(BaseFilter):
             if not obj.text or not obj.text.startswith(f"/{self.command}"):
                 return False
 
-            current_dialogs: Sequence[
-                Question
-            ] = await repo.questions.get_active_questions()
-
-            for dialog in current_dialogs:
-                if dialog.EmployeeChatId == obj.from_user.id:
-                    return {"active_dialog_token": dialog.Token}
+            active_dialog_token = await find_active_question_token(
+                obj.from_user.id, repo
+            )
+            if active_dialog_token:
+                return {"active_dialog_token": active_dialog_token}
 
             return False
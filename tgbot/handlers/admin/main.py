@@ -1,11 +1,12 @@
 import logging
 
 from aiogram import F, Router
-from aiogram.filters import Command, CommandStart
+from aiogram.filters import Command, CommandObject, CommandStart
 from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery, Message
 
 from infrastructure.database.models import User
+from infrastructure.database.repo.requests import RequestsRepo
 from tgbot.config import load_config
 from tgbot.filters.admin import AdminFilter
 from tgbot.filters.topic import IsTopicMessage
@@ -13,6 +14,7 @@ from tgbot.handlers.user.main import main_cb
 from tgbot.keyboards.admin.main import AdminMenu, ChangeRole, admin_kb
 from tgbot.keyboards.user.main import user_kb
 from tgbot.misc.dicts import role_names
+from tgbot.services import broadcaster
 from tgbot.services.logger import setup_logging
 
 admin_router = Router()
@@ -117,3 +119,33 @@ async def reset_role_cmd(message: Message, state: FSMContext, user: User) -> Non
     logging.info(
         f"[Админ] {message.from_user.username} ({message.from_user.id}): Роль изменена с {state_data.get('role')} на {user.Role} командой"
     )
+
+
+@admin_router.message(Command("broadcast"), ~IsTopicMessage())
+async def broadcast_cmd(
+    message: Message, command: CommandObject, repo: RequestsRepo
+) -> None:
+    """
+    Рассылка сообщения всем сотрудникам, задававшим вопросы.
+    Прогресс отображается в ответном сообщении, рассылка продолжается после перезапуска бота
+    """
+    if not command.args:
+        await message.answer(
+            "Использование: <code>/broadcast текст сообщения</code>"
+        )
+        return
+
+    users = await repo.questions.get_employee_chat_ids()
+    progress_message = await message.answer(
+        f"📨 <b>Рассылка</b>\n\nПолучателей: {len(users)}"
+    )
+    broadcaster.start_broadcast(
+        message.bot,
+        list(users),
+        command.args,
+        progress_message=progress_message,
+    )
+
+    logging.info(
+        f"[Админ] {message.from_user.username} ({message.from_user.id}): Запущена рассылка на {len(users)} получателей"
+    )
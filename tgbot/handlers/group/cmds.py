@@ -13,10 +13,9 @@ from tgbot.keyboards.user.main import (
     dialog_quality_kb,
 )
 from tgbot.misc import dicts
+from tgbot.services.inactivity import inactivity_tracker
 from tgbot.services.logger import setup_logging
-from tgbot.services.scheduler import (
-    stop_inactivity_timer,
-)
+from tgbot.services.side_effects import SideEffects
 
 topic_cmds_router = Router()
 
@@ -34,46 +33,64 @@ async def end_q_cmd(message: Message, repo: RequestsRepo, user: User):
 
     if question is not None:
         if question.Status != "closed" and question.TopicDutyFullname == user.FIO:
-            # Останавливаем таймер неактивности
-            stop_inactivity_timer(question.Token)
-
-            await repo.questions.update_question_status(
-                token=question.Token, status="closed"
-            )
-            await repo.questions.update_question_end(
-                token=question.Token, end_time=datetime.datetime.now()
-            )
-
-            await message.reply(
-                """<b>🔒 Вопрос закрыт</b>""",
-                reply_markup=dialog_quality_kb(token=question.Token, role="duty"),
-            )
+            closed_question = await repo.questions.close(
+                token=question.Token,
+                end_time=datetime.datetime.now(),
+                duty_fullname=user.FIO,
+            )
+            if closed_question is None:
+                await message.reply("<b>🔒 Вопрос был закрыт</b>")
+                logger.warning(
+                    f"[Вопрос] - [Закрытие] Пользователь {message.from_user.username} ({message.from_user.id}): Попытка закрытия вопроса {question.Token} неуспешна. Вопрос закрыт параллельно"
+                )
+                return
+            await repo.commit()
 
-            await message.bot.edit_forum_topic(
-                chat_id=config.tg_bot.forum_id,
-                message_thread_id=question.TopicId,
-                name=question.Token,
-                icon_custom_emoji_id=dicts.topicEmojis["closed"],
-            )
-            await message.bot.close_forum_topic(
-                chat_id=config.tg_bot.forum_id, message_thread_id=question.TopicId
-            )
-
-            employee: User = await repo.users.get_user(
-                fullname=question.EmployeeFullname
-            )
-
-            await message.bot.send_message(
-                chat_id=employee.ChatId,
-                text="<b>🔒 Вопрос закрыт</b>",
-                reply_markup=ReplyKeyboardRemove(),
-            )
-
-            await message.bot.send_message(
-                chat_id=employee.ChatId,
-                text=f"""<b>{user.FIO}</b> закрыл вопрос""",
-                reply_markup=dialog_quality_kb(token=question.Token, role="employee"),
-            )
+            # Останавливаем таймер неактивности
+            inactivity_tracker.stop(question.Token)
+
+            effects = SideEffects(f"Закрытие вопроса {question.Token}")
+            effects.add(
+                "duty_reply",
+                lambda: message.reply(
+                    """<b>🔒 Вопрос закрыт</b>""",
+                    reply_markup=dialog_quality_kb(token=question.Token, role="duty"),
+                ),
+            )
+            effects.add(
+                "edit_topic",
+                lambda: message.bot.edit_forum_topic(
+                    chat_id=config.tg_bot.forum_id,
+                    message_thread_id=question.TopicId,
+                    name=question.Token,
+                    icon_custom_emoji_id=dicts.topicEmojis["closed"],
+                ),
+            )
+            effects.add(
+                "close_topic",
+                lambda: message.bot.close_forum_topic(
+                    chat_id=config.tg_bot.forum_id, message_thread_id=question.TopicId
+                ),
+                after=["edit_topic"],
+            )
+            effects.add(
+                "employee_notice",
+                lambda: message.bot.send_message(
+                    chat_id=question.EmployeeChatId,
+                    text="<b>🔒 Вопрос закрыт</b>",
+                    reply_markup=ReplyKeyboardRemove(),
+                ),
+            )
+            effects.add(
+                "employee_rating",
+                lambda: message.bot.send_message(
+                    chat_id=question.EmployeeChatId,
+                    text=f"""<b>{user.FIO}</b> закрыл вопрос""",
+                    reply_markup=dialog_quality_kb(token=question.Token, role="employee"),
+                ),
+                after=["employee_notice"],
+            )
+            await effects.run()
 
             logger.info(
                 f"[Вопрос] - [Закрытие] Пользователь {message.from_user.username} ({message.from_user.id}): Закрыт вопрос {question.Token} со специалистом {question.EmployeeFullname}"
@@ -116,16 +133,18 @@ async def release_q_cmd(message: Message, repo: RequestsRepo, user: User):
             question.TopicDutyFullname is not None
             and question.TopicDutyFullname == user.FIO
         ):
-            await repo.questions.update_question_duty(
-                token=question.Token, topic_duty=None
-            )
-            await repo.questions.update_question_status(
-                token=question.Token, status="open"
+            released_question = await repo.questions.release(
+                token=question.Token, duty_fullname=user.FIO
             )
+            if released_question is None:
+                await message.reply("""<b>⚠️ Предупреждение</b>
 
-            employee: User = await repo.users.get_user(
-                fullname=question.EmployeeFullname
-            )
+Вопрос уже освобожден или закрыт""")
+                logger.warning(
+                    f"[Вопрос] - [Освобождение] Пользователь {message.from_user.username} ({message.from_user.id}): Попытка освобождения вопроса {question.Token} неуспешна. Вопрос изменен параллельно"
+                )
+                return
+            await repo.commit()
 
             await message.bot.edit_forum_topic(
                 chat_id=config.tg_bot.forum_id,
@@ -137,7 +156,7 @@ async def release_q_cmd(message: Message, repo: RequestsRepo, user: User):
 Для взятия вопроса в работу напишите сообщение в эту тему""")
 
             await message.bot.send_message(
-                chat_id=employee.ChatId,
+                chat_id=question.EmployeeChatId,
                 text=f"""<b>🕊️ Старший покинул чат</b>
 
 Старший <b>{user.FIO}</b> освободил вопрос. Ожидай повторного подключения старшего""",
@@ -184,8 +203,14 @@ async def release_q_cb(callback: CallbackQuery, repo: RequestsRepo):
     )
 
     if question is not None:
-        await repo.questions.update_question_duty(token=question.Token, topic_duty=None)
-        await repo.questions.update_question_status(token=question.Token, status="open")
+        released_question = await repo.questions.release(token=question.Token)
+        if released_question is None:
+            await callback.answer("Вопрос уже освобожден или закрыт", show_alert=True)
+            logger.warning(
+                f"[Вопрос] - [Освобождение] Пользователь {callback.from_user.username} ({callback.from_user.id}): Попытка освобождения вопроса {question.Token} неуспешна. Вопрос не активен"
+            )
+            return
+        await repo.commit()
 
         await callback.message.answer("""<b>🕊️ Вопрос освобожден</b>
 
@@ -1,5 +1,4 @@
 import logging
-from typing import Sequence
 
 from aiogram import F, Router
 from aiogram.types import CallbackQuery, Message
@@ -15,12 +14,11 @@ from tgbot.keyboards.user.main import (
 )
 from tgbot.misc import dicts
 from tgbot.misc.helpers import check_premium_emoji
+from tgbot.services.deletion import deletion_queue
+from tgbot.services.emoji import custom_emojis
+from tgbot.services.inactivity import inactivity_tracker
 from tgbot.services.logger import setup_logging
-from tgbot.services.scheduler import (
-    restart_inactivity_timer,
-    start_inactivity_timer,
-    run_delete_timer,
-)
+from tgbot.services.topic_pool import topic_pool
 
 topic_router = Router()
 
@@ -31,7 +29,13 @@ logger = logging.getLogger(__name__)
 
 
 @topic_router.message(IsTopicMessage())
-async def handle_q_message(message: Message, repo: RequestsRepo, user: User):
+async def handle_q_message(
+    message: Message, repo: RequestsRepo, user: User, album: list[Message] = None
+):
+    # Свободные темы пула не относятся ни к одному вопросу
+    if topic_pool.is_pooled(message.message_thread_id):
+        return
+
     question: Question = await repo.questions.get_question(
         topic_id=message.message_thread_id
     )
@@ -42,27 +46,29 @@ async def handle_q_message(message: Message, repo: RequestsRepo, user: User):
 
     if question is not None and question.Status != "closed":
         if not question.TopicDutyFullname:
-            await repo.questions.update_question_duty(
-                token=question.Token, topic_duty=user.FIO
-            )
-            await repo.questions.update_question_status(
-                token=question.Token, status="in_progress"
+            claimed_question = await repo.questions.claim(
+                token=question.Token, duty_fullname=user.FIO
             )
+            if claimed_question is None:
+                await message.reply("""<b>⚠️ Предупреждение</b>
 
-            duty_topics_today = await repo.questions.get_questions_count_today(
-                duty_fullname=user.FIO
-            )
-            duty_topics_month = await repo.questions.get_questions_count_last_month(
-                duty_fullname=user.FIO
-            )
+Вопрос уже взят в работу другим старшим
 
-            employee: User = await repo.users.get_user(
-                fullname=question.EmployeeFullname
-            )
+<i>Твое сообщение не отобразится пользователю</i>""")
+                logger.warning(
+                    f"[Вопрос] - [В работе] Пользователь {message.from_user.username} ({message.from_user.id}): Попытка взятия вопроса {question.Token} неуспешна. Вопрос взят параллельно"
+                )
+                return
+            await repo.commit()
+
+            (
+                duty_topics_today,
+                duty_topics_month,
+            ) = await repo.questions.get_questions_counts(duty_fullname=user.FIO)
 
             # Запускаем таймер неактивности для нового вопроса
             if config.tg_bot.activity_status:
-                start_inactivity_timer(question.Token, message.bot, repo)
+                inactivity_tracker.touch(question.Token)
 
             await message.bot.edit_forum_topic(
                 chat_id=config.tg_bot.forum_id,
@@ -79,17 +85,24 @@ async def handle_q_message(message: Message, repo: RequestsRepo, user: User):
             )
 
             await message.bot.send_message(
-                chat_id=employee.ChatId,
+                chat_id=question.EmployeeChatId,
                 text=f"""<b>👮‍♂️ Вопрос в работе</b>
 
 Старший <b>{user.FIO}</b> взял вопрос в работу""",
                 reply_markup=finish_question_kb(),
             )
-            await message.bot.copy_message(
-                from_chat_id=config.tg_bot.forum_id,
-                message_id=message.message_id,
-                chat_id=employee.ChatId,
-            )
+            if album:
+                await message.bot.copy_messages(
+                    from_chat_id=config.tg_bot.forum_id,
+                    message_ids=[part.message_id for part in album],
+                    chat_id=question.EmployeeChatId,
+                )
+            else:
+                await message.bot.copy_message(
+                    from_chat_id=config.tg_bot.forum_id,
+                    message_id=message.message_id,
+                    chat_id=question.EmployeeChatId,
+                )
 
             logger.info(
                 f"[Вопрос] - [В работе] Пользователь {message.from_user.username} ({message.from_user.id}): Вопрос {question.Token} взят в работу"
@@ -98,34 +111,37 @@ async def handle_q_message(message: Message, repo: RequestsRepo, user: User):
             if question.TopicDutyFullname == user.FIO:
                 # Перезапускаем таймер неактивности при сообщении от дежурного
                 if config.tg_bot.activity_status:
-                    restart_inactivity_timer(question.Token, message.bot, repo)
-
-                await message.bot.copy_message(
-                    from_chat_id=config.tg_bot.forum_id,
-                    message_id=message.message_id,
-                    chat_id=question.EmployeeChatId,
-                )
+                    inactivity_tracker.touch(question.Token)
+
+                # Альбом пересылается целиком первым сообщением
+                if album:
+                    await message.bot.copy_messages(
+                        from_chat_id=config.tg_bot.forum_id,
+                        message_ids=[part.message_id for part in album],
+                        chat_id=question.EmployeeChatId,
+                    )
+                else:
+                    await message.bot.copy_message(
+                        from_chat_id=config.tg_bot.forum_id,
+                        message_id=message.message_id,
+                        chat_id=question.EmployeeChatId,
+                    )
 
                 # Уведомление о премиум эмодзи
-                have_premium_emoji, emoji_ids = await check_premium_emoji(message)
+                have_premium_emoji, emoji_ids = await check_premium_emoji(
+                    *(album or [message])
+                )
                 if have_premium_emoji and emoji_ids:
-                    emoji_sticker_list = await message.bot.get_custom_emoji_stickers(
-                        emoji_ids
+                    stickers_text = "".join(
+                        await custom_emojis.resolve(message.bot, emoji_ids)
                     )
 
-                    sticker_info = []
-                    for emoji_sticker in emoji_sticker_list:
-                        sticker_info.append(f"{emoji_sticker.emoji}")
-
-                    stickers_text = "".join(sticker_info)
-
                     emoji_message = await message.reply(f"""<b>💎 Премиум эмодзи</b>
 
 Сообщение содержит премиум эмодзи, собеседник увидит бесплатные аналоги: {stickers_text}
 
 <i>Предупреждение удалится через 30 секунд</i>""")
-                    await run_delete_timer(
-                        bot=message.bot,
+                    deletion_queue.schedule(
                         chat_id=int(config.tg_bot.forum_id),
                         message_ids=[emoji_message.message_id],
                         seconds=30,
@@ -175,18 +191,21 @@ async def return_q_duty(
     await callback.answer()
     question: Question = await repo.questions.get_question(token=callback_data.token)
     employee: User = await repo.users.get_user(user_id=question.EmployeeChatId)
-    available_to_return_questions: Sequence[
-        Question
-    ] = await repo.questions.get_available_to_return_questions()
-    active_dialogs = await repo.questions.get_active_questions()
+    employee_has_active_question = await repo.questions.has_active_question(
+        employee_fullname=employee.FIO
+    )
+    question_returnable = await repo.questions.is_question_returnable(
+        token=question.Token
+    )
 
     if (
         question.Status == "closed"
-        and employee.FIO not in [d.EmployeeFullname for d in active_dialogs]
-        and question.Token in [d.Token for d in available_to_return_questions]
+        and not employee_has_active_question
+        and question_returnable
         and question.TopicDutyFullname == user.FIO
+        and await repo.questions.reopen(token=question.Token)
     ):
-        await repo.questions.update_question_status(token=question.Token, status="open")
+        await repo.commit()
 
         await callback.bot.edit_forum_topic(
             chat_id=config.tg_bot.forum_id,
@@ -217,14 +236,14 @@ async def return_q_duty(
         logger.warning(
             f"[Вопрос] - [Переоткрытие] Пользователь {callback.from_user.username} ({callback.from_user.id}): Неудачная попытка переоткрытия, вопрос {question.Token} принадлежит другому старшему"
         )
-    elif employee.FIO in [d.EmployeeFullname for d in active_dialogs]:
+    elif employee_has_active_question:
         await callback.answer(
             "У пользователя есть другой открытый вопрос", show_alert=True
         )
         logger.error(
             f"[Вопрос] - [Переоткрытие] Пользователь {callback.from_user.username} ({callback.from_user.id}): Неудачная попытка переоткрытия, у пользователя {question.EmployeeFullname} есть другой открытый вопрос"
         )
-    elif question.Token not in [d.Token for d in available_to_return_questions]:
+    elif not question_returnable:
         await callback.answer(
             "Вопрос не переоткрыть. Прошло более 24 часов", show_alert=True
         )
@@ -13,12 +13,11 @@ from tgbot.keyboards.user.main import (
 )
 from tgbot.misc import dicts
 from tgbot.misc.helpers import check_premium_emoji
+from tgbot.services.deletion import deletion_queue
+from tgbot.services.emoji import custom_emojis
+from tgbot.services.inactivity import inactivity_tracker
 from tgbot.services.logger import setup_logging
-from tgbot.services.scheduler import (
-    restart_inactivity_timer,
-    stop_inactivity_timer,
-    run_delete_timer,
-)
+from tgbot.services.side_effects import SideEffects
 
 user_q_router = Router()
 
@@ -35,48 +34,63 @@ async def active_question_end(
     question: Question = await repo.questions.get_question(token=active_dialog_token)
 
     if question is not None:
-        if question.Status != "closed":
-            # Останавливаем таймер неактивности
-            stop_inactivity_timer(question.Token)
+        if question.Status != "closed" and await repo.questions.close(
+            token=question.Token, end_time=datetime.datetime.now()
+        ):
+            await repo.commit()
 
-            await repo.questions.update_question_status(
-                token=question.Token, status="closed"
-            )
-            await repo.questions.update_question_end(
-                token=question.Token, end_time=datetime.datetime.now()
-            )
+            # Останавливаем таймер неактивности
+            inactivity_tracker.stop(question.Token)
 
-            await message.bot.send_message(
-                chat_id=config.tg_bot.forum_id,
-                message_thread_id=question.TopicId,
-                text=f"""<b>🔒 Вопрос закрыт</b>
+            effects = SideEffects(f"Закрытие вопроса {question.Token}")
+            effects.add(
+                "duty_notice",
+                lambda: message.bot.send_message(
+                    chat_id=config.tg_bot.forum_id,
+                    message_thread_id=question.TopicId,
+                    text=f"""<b>🔒 Вопрос закрыт</b>
 
 <b>{user.FIO}</b> закрыл вопрос""",
-                reply_markup=dialog_quality_kb(token=question.Token, role="duty"),
+                    reply_markup=dialog_quality_kb(token=question.Token, role="duty"),
+                ),
             )
-
-            await message.bot.edit_forum_topic(
-                chat_id=config.tg_bot.forum_id,
-                message_thread_id=question.TopicId,
-                name=question.Token,
-                icon_custom_emoji_id=dicts.topicEmojis["closed"],
+            effects.add(
+                "edit_topic",
+                lambda: message.bot.edit_forum_topic(
+                    chat_id=config.tg_bot.forum_id,
+                    message_thread_id=question.TopicId,
+                    name=question.Token,
+                    icon_custom_emoji_id=dicts.topicEmojis["closed"],
+                ),
             )
-            await message.bot.close_forum_topic(
-                chat_id=config.tg_bot.forum_id, message_thread_id=question.TopicId
+            effects.add(
+                "close_topic",
+                lambda: message.bot.close_forum_topic(
+                    chat_id=config.tg_bot.forum_id, message_thread_id=question.TopicId
+                ),
+                after=["edit_topic"],
             )
-
-            await message.reply(
-                text="<b>🔒 Вопрос закрыт</b>", reply_markup=ReplyKeyboardRemove()
+            effects.add(
+                "employee_reply",
+                lambda: message.reply(
+                    text="<b>🔒 Вопрос закрыт</b>", reply_markup=ReplyKeyboardRemove()
+                ),
             )
-            await message.answer(
-                """Ты закрыл вопрос""",
-                reply_markup=dialog_quality_kb(token=question.Token, role="employee"),
+            effects.add(
+                "employee_rating",
+                lambda: message.answer(
+                    """Ты закрыл вопрос""",
+                    reply_markup=dialog_quality_kb(token=question.Token, role="employee"),
+                ),
+                after=["employee_reply"],
             )
+            await effects.run()
 
             logger.info(
                 f"[Вопрос] - [Закрытие] Пользователь {message.from_user.username} ({message.from_user.id}): Закрыт вопрос {question.Token} с {question.TopicDutyFullname}"
             )
-        elif question.Status == "closed":
+        else:
+            # Вопрос закрыт ранее или параллельным запросом
             await message.reply("<b>🔒 Вопрос был закрыт</b>")
             await message.bot.close_forum_topic(
                 chat_id=config.tg_bot.forum_id, message_thread_id=question.TopicId
@@ -85,54 +99,60 @@ async def active_question_end(
                 f"[Вопрос] - [Закрытие] Пользователь {message.from_user.username} ({message.from_user.id}): Неудачная попытка закрытия вопроса {question.Token} со старшим {question.TopicDutyFullname}. Вопрос уже закрыт"
             )
 
-        else:
-            await message.answer("""<b>⚠️ Ошибка</b>
+    else:
+        await message.answer("""<b>⚠️ Ошибка</b>
 
 Не удалось найти вопрос в базе""")
-            logger.error(
-                f"[Вопрос] - [Закрытие] Пользователь {message.from_user.username} ({message.from_user.id}): Попытка закрытия вопроса неуспешна. Не удалось найти вопрос в базе с TopicId = {message.message_id}"
-            )
+        logger.error(
+            f"[Вопрос] - [Закрытие] Пользователь {message.from_user.username} ({message.from_user.id}): Попытка закрытия вопроса неуспешна. Не удалось найти вопрос в базе с TopicId = {message.message_id}"
+        )
 
 
 @user_q_router.message(ActiveQuestion())
 async def active_question(
-    message: Message, repo: RequestsRepo, user: User, active_dialog_token: str = None
+    message: Message,
+    repo: RequestsRepo,
+    user: User,
+    active_dialog_token: str = None,
+    album: list[Message] = None,
 ):
-    question: Question = await repo.questions.get_question(token=active_dialog_token)
-
     if message.text == "✅️ Закрыть вопрос":
         await active_question_end(message, repo, user, active_dialog_token)
         return
 
+    question: Question = await repo.questions.get_question(token=active_dialog_token)
+
     # Перезапускаем таймер неактивности при сообщении от пользователя
     if config.tg_bot.activity_status:
-        restart_inactivity_timer(question.Token, message.bot, repo)
-
-    await message.bot.copy_message(
-        from_chat_id=message.chat.id,
-        message_id=message.message_id,
-        chat_id=config.tg_bot.forum_id,
-        message_thread_id=question.TopicId,
-    )
+        inactivity_tracker.touch(question.Token)
+
+    # Альбом пересылается целиком первым сообщением
+    if album:
+        await message.bot.copy_messages(
+            from_chat_id=message.chat.id,
+            message_ids=[part.message_id for part in album],
+            chat_id=config.tg_bot.forum_id,
+            message_thread_id=question.TopicId,
+        )
+    else:
+        await message.bot.copy_message(
+            from_chat_id=message.chat.id,
+            message_id=message.message_id,
+            chat_id=config.tg_bot.forum_id,
+            message_thread_id=question.TopicId,
+        )
 
     # Уведомление о премиум эмодзи
-    have_premium_emoji, emoji_ids = await check_premium_emoji(message)
+    have_premium_emoji, emoji_ids = await check_premium_emoji(*(album or [message]))
     if have_premium_emoji and emoji_ids:
-        emoji_sticker_list = await message.bot.get_custom_emoji_stickers(emoji_ids)
-
-        sticker_info = []
-        for emoji_sticker in emoji_sticker_list:
-            sticker_info.append(f"{emoji_sticker.emoji}")
-
-        stickers_text = "".join(sticker_info)
+        stickers_text = "".join(await custom_emojis.resolve(message.bot, emoji_ids))
 
         emoji_message = await message.reply(f"""<b>💎 Премиум эмодзи</b>
 
 Сообщение содержит премиум эмодзи, собеседник увидит бесплатные аналоги: {stickers_text}
 
 <i>Предупреждение удалится через 30 секунд</i>""")
-        await run_delete_timer(
-            bot=message.bot,
+        deletion_queue.schedule(
             chat_id=message.chat.id,
             message_ids=[emoji_message.message_id],
             seconds=30,
@@ -2,6 +2,7 @@ import datetime
 import logging
 
 from aiogram import F, Router
+from aiogram.exceptions import TelegramAPIError
 from aiogram.filters import CommandStart
 from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery, Message
@@ -19,8 +20,11 @@ from tgbot.keyboards.user.main import (
 from tgbot.misc import dicts
 from tgbot.misc.helpers import disable_previous_buttons
 from tgbot.misc.states import AskQuestion
+from tgbot.services.inactivity import inactivity_tracker
 from tgbot.services.logger import setup_logging
-from tgbot.services.scheduler import remove_question_timer, start_inactivity_timer
+from tgbot.services.scheduler import remove_question_timer
+from tgbot.services.side_effects import SideEffects
+from tgbot.services.topic_pool import topic_pool
 
 user_router = Router()
 
@@ -101,52 +105,61 @@ async def ask_question(callback: CallbackQuery, user: User, state: FSMContext):
 
 @user_router.message(AskQuestion.question)
 async def question_text(
-    message: Message, user: User, repo: RequestsRepo, state: FSMContext
+    message: Message,
+    user: User,
+    repo: RequestsRepo,
+    state: FSMContext,
+    album: list[Message] = None,
 ):
-    if message.caption:
-        await state.update_data(question=message.caption)
-    else:
-        await state.update_data(question=message.text)
-    await state.update_data(question_message_id=message.message_id)
-
-    # Отключаем кнопки на предыдущих шагах
-    await disable_previous_buttons(message, state)
-
-    state_data = await state.get_data()
-
-    employee_topics_today = await repo.questions.get_questions_count_today(
-        employee_fullname=user.FIO
+    # Подпись альбома может быть у любой его части
+    parts = album or [message]
+    question = next(
+        (part.caption or part.text for part in parts if part.caption or part.text), None
     )
-    employee_topics_month = await repo.questions.get_questions_count_last_month(
-        employee_fullname=user.FIO
+
+    # Отключаем кнопки на предыдущих шагах и сохраняем вопрос одним обновлением
+    await disable_previous_buttons(
+        message,
+        state,
+        question=question,
+        question_message_ids=[part.message_id for part in parts],
     )
 
-    # Выключаем все предыдущие кнопки
-    await disable_previous_buttons(message, state)
+    state_data = await state.get_data()
 
-    new_topic = await message.bot.create_forum_topic(
-        chat_id=config.tg_bot.forum_id,
-        name=user.FIO,
-        icon_custom_emoji_id=dicts.topicEmojis["open"],
-    )  # Создание темы
+    # Статистика считается до добавления нового вопроса
+    (
+        employee_topics_today,
+        employee_topics_month,
+    ) = await repo.questions.get_questions_counts(employee_fullname=user.FIO)
+
+    # Свободная тема из пула переименовывается уже после ответа специалисту
+    topic_id = topic_pool.take(message.bot)
+    from_pool = topic_id is not None
+    if not from_pool:
+        new_topic = await message.bot.create_forum_topic(
+            chat_id=config.tg_bot.forum_id,
+            name=user.FIO,
+            icon_custom_emoji_id=dicts.topicEmojis["open"],
+        )  # Создание темы
+        topic_id = new_topic.message_thread_id
 
     # Now add the question within the same session
     new_question = await repo.questions.add_question(
         employee_chat_id=message.chat.id,
         employee_fullname=user.FIO,
-        topic_id=new_topic.message_thread_id,
+        topic_id=topic_id,
         start_time=datetime.datetime.now(),
         question_text=state_data.get("question"),
     )  # Добавление вопроса в БД
+    if from_pool:
+        await repo.topic_pool.remove_topics([topic_id])
+    await repo.commit()  # Вопрос должен быть виден до отправки кнопки отмены
 
-    admins_working = 0
-    for admin in config.tg_bot.admin_ids:
-        admin_db: User = await repo.users.get_user(user_id=admin)
-        is_admin_working = await repo.buffer.is_user_working_today(
-            fio=admin_db.FIO, division=admin_db.Division
-        )
-        if is_admin_working:
-            admins_working += 1
+    admins = await repo.users.get_users_by_ids(config.tg_bot.admin_ids)
+    admins_working = await repo.buffer.count_working_today(
+        (admin_db.FIO, admin_db.Division) for admin_db in admins.values()
+    )
 
     if admins_working > 0:
         await message.answer(
@@ -165,13 +178,42 @@ async def question_text(
             reply_markup=cancel_question_kb(token=new_question.Token),
         )
 
+    if from_pool:
+        try:
+            await message.bot.edit_forum_topic(
+                chat_id=config.tg_bot.forum_id,
+                message_thread_id=topic_id,
+                name=user.FIO,
+                icon_custom_emoji_id=dicts.topicEmojis["open"],
+            )
+        except TelegramAPIError as e:
+            # Свободная тема была удалена вручную или недоступна - переносим вопрос в новую
+            logger.warning(
+                f"[Пул тем] Не удалось занять свободную тему {topic_id}: {e}"
+            )
+            try:
+                new_topic = await message.bot.create_forum_topic(
+                    chat_id=config.tg_bot.forum_id,
+                    name=user.FIO,
+                    icon_custom_emoji_id=dicts.topicEmojis["open"],
+                )
+            except TelegramAPIError as e:
+                # Оставляем вопрос в свободной теме, она будет переименована дежурным вручную
+                logger.error(
+                    f"[Пул тем] Не удалось создать тему для вопроса {new_question.Token}: {e}"
+                )
+            else:
+                topic_id = new_topic.message_thread_id
+                await repo.questions.move_to_topic(new_question.Token, topic_id)
+                await repo.commit()
+
     # Запускаем таймер неактивности для нового вопроса (только если статус "open")
     if new_question.Status == "open" and config.tg_bot.activity_status:
-        start_inactivity_timer(new_question.Token, message.bot, repo)
+        inactivity_tracker.touch(new_question.Token)
 
     topic_info_msg = await message.bot.send_message(
         chat_id=config.tg_bot.forum_id,
-        message_thread_id=new_topic.message_thread_id,
+        message_thread_id=topic_id,
         text=f"""Вопрос задает <b>{user.FIO}</b> {'(<a href="https://t.me/' + user.Username + '">лс</a>)' if (user.Username != "Не указан" or user.Username != "Скрыто/не определено") else ""}
 
 <blockquote expandable><b>👔 Должность:</b> {user.Position}
@@ -181,18 +223,25 @@ async def question_text(
         disable_web_page_preview=True,
     )
 
-    await message.bot.copy_message(
-        chat_id=config.tg_bot.forum_id,
-        message_thread_id=new_topic.message_thread_id,
-        from_chat_id=message.chat.id,
-        message_id=state_data.get("question_message_id"),
-    )  # Копирование сообщения специалиста в тему
-
-    await message.bot.pin_chat_message(
-        chat_id=config.tg_bot.forum_id,
-        message_id=topic_info_msg.message_id,
-        disable_notification=True,
+    effects = SideEffects(f"Создание вопроса {new_question.Token}")
+    effects.add(
+        "copy_question",
+        lambda: message.bot.copy_messages(
+            chat_id=config.tg_bot.forum_id,
+            message_thread_id=topic_id,
+            from_chat_id=message.chat.id,
+            message_ids=state_data.get("question_message_ids"),
+        ),
+    )  # Копирование сообщения специалиста в тему, альбом - целиком
+    effects.add(
+        "pin_info",
+        lambda: message.bot.pin_chat_message(
+            chat_id=config.tg_bot.forum_id,
+            message_id=topic_info_msg.message_id,
+            disable_notification=True,
+        ),
     )  # Пин информации о специалисте
+    await effects.run()
 
     await state.clear()
     logging.info(
@@ -222,7 +271,7 @@ async def cancel_question(
         await callback.bot.close_forum_topic(
             chat_id=config.tg_bot.forum_id, message_thread_id=question.TopicId
         )
-        await remove_question_timer(bot=callback.bot, question=question, repo=repo)
+        await remove_question_timer(bot=callback.bot, question=question)
         await callback.bot.send_message(
             chat_id=config.tg_bot.forum_id,
             message_thread_id=question.TopicId,
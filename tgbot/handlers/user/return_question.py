@@ -43,14 +43,18 @@ async def return_finished_q(
     """
     await callback.answer()
     await state.clear()
-    active_dialogs = await repo.questions.get_active_questions()
     question: Question = await repo.questions.get_question(token=callback_data.token)
     duty: User = await repo.users.get_user(fullname=question.TopicDutyFullname)
+    has_active_question = await repo.questions.has_active_question(
+        employee_fullname=user.FIO
+    )
 
-    if question.Status == "closed" and user.FIO not in [
-        d.EmployeeFullname for d in active_dialogs
-    ]:
-        await repo.questions.update_question_status(token=question.Token, status="open")
+    if (
+        question.Status == "closed"
+        and not has_active_question
+        and await repo.questions.reopen(token=question.Token)
+    ):
+        await repo.commit()
 
         await callback.bot.edit_forum_topic(
             chat_id=config.tg_bot.forum_id,
@@ -85,7 +89,7 @@ async def return_finished_q(
         logger.info(
             f"[Вопрос] - [Переоткрытие] Пользователь {callback.from_user.username} ({callback.from_user.id}): Вопрос {question.Token} переоткрыт специалистом"
         )
-    elif user.FIO in [d.EmployeeFullname for d in active_dialogs]:
+    elif has_active_question:
         await callback.answer("У тебя есть другой открытый вопрос", show_alert=True)
         logger.info(
             f"[Вопрос] - [Переоткрытие] Пользователь {callback.from_user.username} ({callback.from_user.id}): Неудачная попытка переоткрытия, у специалиста есть другой открытй вопрос"
@@ -198,13 +202,17 @@ async def return_q_confirm(
         return
 
     duty: User = await repo.users.get_user(fullname=question.TopicDutyFullname)
-    active_dialogs = await repo.questions.get_active_questions()
+    has_active_question = await repo.questions.has_active_question(
+        employee_fullname=user.FIO
+    )
 
-    if question.Status == "closed" and user.FIO not in [
-        d.EmployeeFullname for d in active_dialogs
-    ]:
+    if (
+        question.Status == "closed"
+        and not has_active_question
         # 1. Обновляем статус вопроса на "open"
-        await repo.questions.update_question_status(token=question.Token, status="open")
+        and await repo.questions.reopen(token=question.Token)
+    ):
+        await repo.commit()
 
         # 2. Обновляем название и иконку темы
         await callback.bot.edit_forum_topic(
@@ -242,7 +250,7 @@ async def return_q_confirm(
             reply_markup=reopened_question_kb(),
             disable_web_page_preview=True,
         )
-    elif user.FIO in [d.EmployeeFullname for d in active_dialogs]:
+    elif has_active_question:
         # Проверка на наличие открытых вопросов у специалиста
         await callback.answer("У тебя есть другой открытый вопрос", show_alert=True)
         logger.error(
@@ -4,9 +4,11 @@ from typing import Any, Awaitable, Callable, Dict, Union
 from aiogram import BaseMiddleware, Bot
 from aiogram.types import CallbackQuery, Message
 
+from infrastructure.database.cache.users import user_cache
 from infrastructure.database.models import User
 from infrastructure.database.repo.requests import RequestsRepo
 from tgbot.config import Config
+from tgbot.services.forum_guard import forum_guard
 from tgbot.services.logger import setup_logging
 
 setup_logging()
@@ -27,49 +29,52 @@ class DatabaseMiddleware(BaseMiddleware):
         event: Union[Message, CallbackQuery],
         data: Dict[str, Any],
     ) -> Any:
+        message_thread_id = None
+        is_bot = False
+
+        if isinstance(event, Message):
+            # Обычное текстовое сообщение
+            message_thread_id = event.message_thread_id
+            is_bot = event.from_user.is_bot
+        elif isinstance(event, CallbackQuery) and event.message:
+            # CallbackQuery - проверяем оригинальное сообщение
+            message_thread_id = getattr(event.message, "message_thread_id", None)
+            is_bot = event.from_user.is_bot
+
+        # Повторные события от уже заблокированных пользователей отбрасываем без запросов
+        is_forum_event = bool(message_thread_id) and not is_bot
+        if is_forum_event and forum_guard.is_blocked(event.from_user.id):
+            return
+
         async with self.session_pool() as session:
             repo: RequestsRepo = RequestsRepo(session)
 
             user: User = await repo.users.get_user(user_id=event.from_user.id)
 
-            message_thread_id = None
-            is_bot = False
-
-            if isinstance(event, Message):
-                # Обычное текстовое сообщение
-                message_thread_id = event.message_thread_id
-                is_bot = event.from_user.is_bot
-            elif isinstance(event, CallbackQuery) and event.message:
-                # CallbackQuery - проверяем оригинальное сообщение
-                message_thread_id = getattr(event.message, "message_thread_id", None)
-                is_bot = event.from_user.is_bot
+            # Роль могли выдать в другом боте - перед блокировкой перечитываем снимок из БД
+            if user and user.Role != 10 and is_forum_event:
+                user_cache.invalidate(user_id=event.from_user.id)
+                user = await repo.users.get_user(user_id=event.from_user.id)
 
             # Проверка на существования пользователя
-            if not user and message_thread_id and not is_bot:
-                await self.bot.ban_chat_member(
-                    chat_id=self.config.tg_bot.forum_id, user_id=event.from_user.id
-                )
-                await self.bot.send_message(
+            if not user and is_forum_event:
+                await forum_guard.block(
+                    bot=self.bot,
                     chat_id=self.config.tg_bot.forum_id,
-                    text=f"""<b>Блокировка</b>
+                    user_id=event.from_user.id,
+                    notice=f"""<b>Блокировка</b>
 
 Пользователь с id {event.from_user.id} не найден в базе""",
                 )
                 return
 
             # Проверка роли пользователя для доступа к группе
-            if (
-                user
-                and user.Role is not 10
-                and message_thread_id
-                and not is_bot
-            ):
-                await self.bot.ban_chat_member(
-                    chat_id=self.config.tg_bot.forum_id, user_id=event.from_user.id
-                )
-                await self.bot.send_message(
+            if user and user.Role != 10 and is_forum_event:
+                await forum_guard.block(
+                    bot=self.bot,
                     chat_id=self.config.tg_bot.forum_id,
-                    text=f"""<b>Блокировка</b>
+                    user_id=event.from_user.id,
+                    notice=f"""<b>Блокировка</b>
 
 Пользователь имеет роль {user.Role}, для доступа нужна роль 10""",
                 )
@@ -79,5 +84,11 @@ class DatabaseMiddleware(BaseMiddleware):
             data["repo"] = repo
             data["user"] = user
 
-            result = await handler(event, data)
+            # Единица работы на апдейт: репозитории только делают flush, коммит - один раз после хендлера
+            try:
+                result = await handler(event, data)
+            except Exception:
+                await session.rollback()
+                raise
+            await session.commit()
         return result
\ No newline at end of file
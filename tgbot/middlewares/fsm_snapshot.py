@@ -0,0 +1,148 @@
+import copy
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional, Union
+
+from aiogram import BaseMiddleware
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import StateType
+from aiogram.fsm.storage.redis import RedisStorage
+from aiogram.types import CallbackQuery, Message
+
+class SnapshotFSMContext(FSMContext):
+    """
+    FSMContext, работающий со снимком состояния на время одного апдейта.
+
+    Данные читаются из хранилища один раз при первом обращении, дальнейшие чтения и записи
+    идут в снимок. Изменения записываются в хранилище одним вызовом flush() после хендлера.
+
+    Хендлер может долго ждать Telegram и БД, поэтому flush записывает только ключи, измененные
+    через update_data, поверх свежих данных хранилища - параллельный апдейт того же
+    пользователя не теряет свои изменения. Полностью данные перезаписывают только set_data и clear.
+    """
+
+    def __init__(self, context: FSMContext, raw_state: Optional[str]):
+        super().__init__(storage=context.storage, key=context.key)
+        self._state = raw_state
+        self._state_changed = False
+        self._data: Optional[dict[str, Any]] = None
+        self._updates: dict[str, Any] = {}
+        self._replaced = False
+
+    async def _snapshot(self) -> dict[str, Any]:
+        if self._data is None:
+            self._data = await self.storage.get_data(key=self.key)
+        return self._data
+
+    async def set_state(self, state: StateType = None) -> None:
+        self._state = state.state if isinstance(state, State) else state
+        self._state_changed = True
+
+    async def get_state(self) -> Optional[str]:
+        return self._state
+
+    async def set_data(self, data: Mapping[str, Any]) -> None:
+        # Данные перезаписываются целиком, поэтому читать их из хранилища не нужно
+        self._data = copy.deepcopy(dict(data))
+        self._updates = {}
+        self._replaced = True
+
+    async def get_data(self) -> dict[str, Any]:
+        return copy.deepcopy(await self._snapshot())
+
+    async def get_value(self, key: str, default: Any = None) -> Any:
+        return copy.deepcopy((await self._snapshot()).get(key, default))
+
+    async def update_data(
+        self,
+        data: Optional[Mapping[str, Any]] = None,
+        **kwargs: Any,
+    ) -> dict[str, Any]:
+        if data:
+            kwargs.update(data)
+        snapshot = await self._snapshot()
+        updates = copy.deepcopy(kwargs)
+        snapshot.update(updates)
+        if not self._replaced:
+            self._updates.update(updates)
+        return copy.deepcopy(snapshot)
+
+    @property
+    def data_changed(self) -> bool:
+        return self._replaced or bool(self._updates)
+
+    async def _data_to_write(self) -> dict[str, Any]:
+        if self._replaced:
+            return self._data
+        current = await self.storage.get_data(key=self.key)
+        current.update(self._updates)
+        return current
+
+    async def flush(self) -> None:
+        """
+        Записывает измененные состояние и данные в хранилище.
+
+        Для RedisStorage обе записи уходят одним pipeline, для остальных хранилищ - обычными вызовами.
+        """
+        if not self._state_changed and not self.data_changed:
+            return
+
+        data = await self._data_to_write() if self.data_changed else None
+
+        if isinstance(self.storage, RedisStorage):
+            await self._flush_redis(self.storage, data)
+        else:
+            if self._state_changed:
+                await self.storage.set_state(key=self.key, state=self._state)
+            if data is not None:
+                await self.storage.set_data(key=self.key, data=data)
+
+        self._state_changed = False
+        self._updates = {}
+        self._replaced = False
+        if data is not None:
+            self._data = copy.deepcopy(data)
+
+    async def _flush_redis(
+        self, storage: RedisStorage, data: Optional[dict[str, Any]]
+    ) -> None:
+        pipe = storage.redis.pipeline(transaction=False)
+        if self._state_changed:
+            state_key = storage.key_builder.build(self.key, "state")
+            if self._state is None:
+                pipe.delete(state_key)
+            else:
+                pipe.set(state_key, self._state, ex=storage.state_ttl)
+        if data is not None:
+            data_key = storage.key_builder.build(self.key, "data")
+            if not data:
+                pipe.delete(data_key)
+            else:
+                pipe.set(data_key, storage.json_dumps(data), ex=storage.data_ttl)
+        await pipe.execute()
+
+
+class FSMSnapshotMiddleware(BaseMiddleware):
+    """
+    Подменяет FSMContext апдейта на SnapshotFSMContext и сохраняет изменения после хендлера.
+
+    Изменения сохраняются и при ошибке в хендлере, как если бы они записывались сразу.
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[
+            [Union[Message, CallbackQuery], Dict[str, Any]], Awaitable[Any]
+        ],
+        event: Union[Message, CallbackQuery],
+        data: Dict[str, Any],
+    ) -> Any:
+        context: Optional[FSMContext] = data.get("state")
+        if context is None or isinstance(context, SnapshotFSMContext):
+            return await handler(event, data)
+
+        snapshot = SnapshotFSMContext(context, data.get("raw_state"))
+        data["state"] = snapshot
+        try:
+            return await handler(event, data)
+        finally:
+            await snapshot.flush()
@@ -0,0 +1,31 @@
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import Message
+
+from tgbot.services.media_group import media_groups
+
+
+class MediaGroupMiddleware(BaseMiddleware):
+    """
+    Собирает альбом до открытия сессии БД и передает его хендлеру первого сообщения в album.
+
+    Остальные сообщения альбома дальше не обрабатываются. Регистрируется раньше
+    DatabaseMiddleware, чтобы ожидание частей альбома не занимало соединение пула.
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[Message, Dict[str, Any]], Awaitable[Any]],
+        event: Message,
+        data: Dict[str, Any],
+    ) -> Any:
+        if not event.media_group_id:
+            return await handler(event, data)
+
+        album = await media_groups.collect(event)
+        if album is None:
+            return
+
+        data["album"] = album
+        return await handler(event, data)
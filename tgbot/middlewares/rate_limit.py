@@ -0,0 +1,315 @@
+import asyncio
+import bisect
+import itertools
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+
+from infrastructure.database.cache.lru import MISSING, TTLCache
+from tgbot.services.logger import setup_logging
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+# Приоритеты запросов: меньше - раньше
+PRIORITY_REPLY = 0
+PRIORITY_EDIT = 1
+PRIORITY_CLEANUP = 2
+PRIORITY_BACKGROUND = 3
+
+# Приоритет, переопределяющий приоритет метода для запросов из текущего контекста (например, рассылки)
+request_priority: ContextVar[Optional[int]] = ContextVar("request_priority", default=None)
+
+METHOD_PRIORITIES = {
+    "editForumTopic": PRIORITY_EDIT,
+    "closeForumTopic": PRIORITY_EDIT,
+    "reopenForumTopic": PRIORITY_EDIT,
+    "pinChatMessage": PRIORITY_EDIT,
+    "unpinChatMessage": PRIORITY_EDIT,
+    "editMessageReplyMarkup": PRIORITY_EDIT,
+    "deleteMessage": PRIORITY_CLEANUP,
+    "deleteMessages": PRIORITY_CLEANUP,
+    "deleteForumTopic": PRIORITY_CLEANUP,
+}
+
+# Методы отправки сообщений, кроме send*: только они расходуют лимит сообщений в чат
+SEND_METHODS = {"copyMessage", "copyMessages", "forwardMessage", "forwardMessages"}
+
+
+def _is_send_method(api_method: str) -> bool:
+    return api_method.startswith("send") or api_method in SEND_METHODS
+
+
+def _chat_key(chat_id: Optional[int | str]) -> Optional[int | str]:
+    """
+    Приводит числовой chat_id к int, чтобы ID форума из конфига (str) и из БД (int)
+    попадали в одну корзину.
+    """
+    if isinstance(chat_id, str):
+        try:
+            return int(chat_id)
+        except ValueError:
+            return chat_id
+    return chat_id
+
+
+class TokenBucket:
+    """
+    Корзина токенов: rate токенов в секунду, не более capacity накопленных.
+    """
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, now: float) -> float:
+        """
+        Время в секундах до появления свободного токена.
+        """
+        self._refill(now)
+        return 0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def consume(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1
+
+    def block(self, now: float, seconds: float) -> None:
+        """
+        Запрещает выдачу токенов на указанное время, например после ответа 429.
+        """
+        self._refill(now)
+        self.tokens = min(self.tokens, 1 - seconds * self.rate)
+
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "chat_id", "future")
+
+    def __init__(
+        self, priority: int, seq: int, chat_id: Optional[int | str], future: asyncio.Future
+    ):
+        self.priority = priority
+        self.seq = seq
+        self.chat_id = chat_id
+        self.future = future
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class RateLimitMiddleware(BaseRequestMiddleware):
+    """
+    Ограничение исходящих запросов к Bot API.
+
+    Запросы, адресованные чату, проходят через общую корзину токенов. Отправка сообщений
+    (send*, copy*, forward*) дополнительно проходит через корзину своего чата: для групп
+    и форума лимит значительно строже, чем для личных чатов. Изменения, удаления, управление
+    темами и пользователями этот лимит не расходуют. Ожидающие запросы выпускаются по
+    приоритету - ответы пользователям раньше изменений топиков, а те раньше удалений.
+    Одновременно ждать могут не больше max_queue запросов, остальные ждут места в очереди.
+    При ответе 429 отправка в чат блокируется на retry_after, и запрос повторяется.
+    Запросы без chat_id и запросы на чтение (get*) не ограничиваются.
+
+    Фоновые задачи могут понизить приоритет своих запросов через request_priority.
+    """
+
+    def __init__(
+        self,
+        global_rate: float = 30,
+        private_rate: float = 1,
+        private_burst: float = 3,
+        group_rate: float = 20 / 60,
+        group_burst: float = 20,
+        max_queue: int = 1000,
+        max_retries: int = 3,
+    ):
+        self.private_rate = private_rate
+        self.private_burst = private_burst
+        self.group_rate = group_rate
+        self.group_burst = group_burst
+        self.max_retries = max_retries
+
+        self._global = TokenBucket(global_rate, global_rate)
+        # Простаивающая корзина полна, поэтому ее можно безопасно вытеснить и создать заново
+        self._chats: TTLCache[int | str, TokenBucket] = TTLCache(maxsize=10000, ttl=600)
+        self._queue: list[_Waiter] = []
+        self._queue_slots = asyncio.Semaphore(max_queue)
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._dispatcher: Optional[asyncio.Task] = None
+
+        self.sent = 0
+        self.delayed = 0
+        self.retried = 0
+        self.max_wait = 0.0
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        chat_id = _chat_key(getattr(method, "chat_id", None))
+        api_method = method.__api_method__
+        if chat_id is None or api_method.startswith("get"):
+            return await make_request(bot, method)
+
+        priority = request_priority.get()
+        if priority is None:
+            priority = METHOD_PRIORITIES.get(api_method, PRIORITY_REPLY)
+        # Корзина чата расходуется только отправкой сообщений
+        bucket_key = chat_id if _is_send_method(api_method) else None
+        for attempt in range(self.max_retries + 1):
+            await self._acquire(bucket_key, priority)
+            try:
+                response = await make_request(bot, method)
+                self.sent += 1
+                return response
+            except TelegramRetryAfter as e:
+                self.retried += 1
+                self._bucket(chat_id).block(time.monotonic(), e.retry_after)
+                logger.warning(
+                    f"[Лимиты] {api_method} в чат {chat_id}: превышен лимит, повтор через {e.retry_after} с."
+                )
+                if attempt == self.max_retries:
+                    raise
+                if bucket_key is None:
+                    # Запрос не проходит через корзину чата, поэтому ждем блокировку сами
+                    await asyncio.sleep(e.retry_after)
+
+    def _bucket(self, chat_id: int | str) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is MISSING:
+            if isinstance(chat_id, int) and chat_id > 0:
+                bucket = TokenBucket(self.private_rate, self.private_burst)
+            else:
+                bucket = TokenBucket(self.group_rate, self.group_burst)
+        # Продлеваем жизнь корзины при каждом обращении
+        self._chats.set(chat_id, bucket)
+        return bucket
+
+    def _try_consume(self, chat_id: Optional[int | str], now: float) -> float:
+        """
+        Забирает токены из общей корзины и корзины чата (если chat_id задан), если они доступны.
+
+        Returns:
+            float: 0 при успехе, иначе время до появления токенов
+        """
+        bucket = self._bucket(chat_id) if chat_id is not None else None
+        delay = self._global.delay(now)
+        if bucket is not None:
+            delay = max(delay, bucket.delay(now))
+        if delay <= 0:
+            self._global.consume(now)
+            if bucket is not None:
+                bucket.consume(now)
+        return delay
+
+    async def _acquire(self, chat_id: Optional[int | str], priority: int) -> None:
+        if not self._queue and self._try_consume(chat_id, time.monotonic()) <= 0:
+            return
+
+        started = time.monotonic()
+        self.delayed += 1
+        async with self._queue_slots:
+            waiter = _Waiter(
+                priority, next(self._seq), chat_id, asyncio.get_running_loop().create_future()
+            )
+            bisect.insort(self._queue, waiter)
+            self._wakeup.set()
+            if self._dispatcher is None or self._dispatcher.done():
+                self._dispatcher = asyncio.create_task(self._dispatch())
+
+            try:
+                await waiter.future
+            finally:
+                if waiter in self._queue:
+                    self._queue.remove(waiter)
+        self.max_wait = max(self.max_wait, time.monotonic() - started)
+
+    async def _dispatch(self) -> None:
+        """
+        Выпускает ожидающие запросы по приоритету по мере появления токенов.
+        """
+        while self._queue:
+            self._wakeup.clear()
+            delay = self._release_next(time.monotonic())
+            if delay <= 0:
+                continue
+
+            # Новый запрос может оказаться готов раньше, поэтому ждем и сигнал о нем
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def _release_next(self, now: float) -> float:
+        """
+        Выпускает первый по приоритету запрос, для которого есть токены.
+
+        Returns:
+            float: 0 если запрос выпущен, иначе время до появления токенов
+        """
+        delay = self._global.delay(now)
+        if delay > 0:
+            return delay
+
+        delays = []
+        checked = set()
+        for waiter in list(self._queue):
+            if waiter.future.done():
+                self._queue.remove(waiter)
+                continue
+            if waiter.chat_id in checked:
+                continue
+            checked.add(waiter.chat_id)
+
+            delay = self._try_consume(waiter.chat_id, now)
+            if delay <= 0:
+                self._queue.remove(waiter)
+                waiter.future.set_result(None)
+                return 0
+            delays.append(delay)
+
+        return min(delays, default=0)
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Метрики ограничителя: глубина очереди по приоритетам и счетчики запросов.
+        """
+        return {
+            "queue_depth": self.queue_depth,
+            "queued_by_priority": dict(Counter(waiter.priority for waiter in self._queue)),
+            "sent": self.sent,
+            "delayed": self.delayed,
+            "retried": self.retried,
+            "max_wait": round(self.max_wait, 3),
+        }
+
+    def log_stats(self) -> None:
+        """
+        Пишет метрики ограничителя в лог.
+        """
+        logger.info(f"[Лимиты] {self.stats()}")
@@ -1,29 +1,80 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any
+
+from aiogram.exceptions import TelegramAPIError, TelegramBadRequest
 from aiogram.fsm.context import FSMContext
 from aiogram.types import Message
 
+from tgbot.services.logger import setup_logging
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+# Сколько последних сообщений с уже снятыми кнопками помнить
+STRIPPED_CACHE_SIZE = 10_000
+
+# Ошибки, после которых сообщение можно считать уже без кнопок
+FINAL_EDIT_ERRORS = ("message is not modified", "message to edit not found")
+
+_stripped: OrderedDict[tuple[int, int], None] = OrderedDict()
+
+
+def _mark_stripped(chat_id: int, message_id: int) -> None:
+    _stripped[(chat_id, message_id)] = None
+    _stripped.move_to_end((chat_id, message_id))
+    while len(_stripped) > STRIPPED_CACHE_SIZE:
+        _stripped.popitem(last=False)
+
+
+async def _strip_buttons(message: Message, message_id: int) -> bool:
+    try:
+        await message.bot.edit_message_reply_markup(
+            chat_id=message.chat.id, message_id=message_id, reply_markup=None
+        )
+    except TelegramBadRequest as e:
+        # Сообщение уже без кнопок или удалено - повторять бесполезно
+        if not any(reason in e.message.lower() for reason in FINAL_EDIT_ERRORS):
+            logger.warning(f"Не удалось снять кнопки с сообщения {message_id}: {e}")
+            return False
+    except TelegramAPIError as e:
+        # Временная ошибка: сообщение не отмечается и остается в списке до следующего вызова
+        logger.warning(f"Не удалось снять кнопки с сообщения {message_id}: {e}")
+        return False
+    _mark_stripped(message.chat.id, message_id)
+    return True
+
+
+async def disable_previous_buttons(message: Message, state: FSMContext, **data: Any):
+    """
+    Функция для отключения inline кнопок в сообщениях.
 
-async def disable_previous_buttons(message: Message, state: FSMContext):
-    """Функция для отключения inline кнопок в сообщениях"""
+    Кнопки снимаются параллельно, сообщения, с которых они уже сняты, пропускаются.
+    В списке остаются только сообщения, с которых снять кнопки не удалось - он сохраняется
+    вместе с остальными данными из data одним обновлением FSM.
+    """
     state_data = await state.get_data()
     messages_with_buttons = state_data.get("messages_with_buttons", [])
 
-    for msg_id in messages_with_buttons:
-        try:
-            await message.bot.edit_message_reply_markup(
-                chat_id=message.chat.id, message_id=msg_id, reply_markup=None
-            )
-        except Exception as e:
-            # Handle case where message might be deleted or not editable
-            print(f"Could not disable buttons for message {msg_id}: {e}")
+    pending = [
+        msg_id
+        for msg_id in dict.fromkeys(messages_with_buttons)
+        if (message.chat.id, msg_id) not in _stripped
+    ]
+    results = await asyncio.gather(
+        *(_strip_buttons(message, msg_id) for msg_id in pending)
+    )
+    failed = [msg_id for msg_id, stripped in zip(pending, results) if not stripped]
 
-    # Clear the list after disabling buttons
-    await state.update_data(messages_with_buttons=[])
+    await state.update_data(messages_with_buttons=failed, **data)
 
 
-async def check_premium_emoji(message: Message) -> tuple[bool, list[str]]:
+async def check_premium_emoji(*messages: Message) -> tuple[bool, list[str]]:
+    """Поиск премиум эмодзи в тексте и подписях сообщений, например всех частей альбома"""
     emoji_ids = []
-    if message.entities:
-        for entity in message.entities:
+    for message in messages:
+        for entity in (message.entities or []) + (message.caption_entities or []):
             if entity.type == "custom_emoji":
                 emoji_ids.append(entity.custom_emoji_id)
     return len(emoji_ids) > 0, emoji_ids
\ No newline at end of file
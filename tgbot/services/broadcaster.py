@@ -1,10 +1,78 @@
 import asyncio
+import json
 import logging
-from typing import Union
+import os
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Optional, Union
 
 from aiogram import Bot, exceptions
 from aiogram.types import InlineKeyboardMarkup
 
+from tgbot.config import load_config
+from tgbot.middlewares.rate_limit import PRIORITY_BACKGROUND, request_priority
+
+config = load_config(".env")
+
+# Через сколько заблокировавший бота чат снова попадает в рассылки
+BLOCKED_TTL = 30 * 24 * 60 * 60
+
+SENT = "sent"
+BLOCKED = "blocked"
+FAILED = "failed"
+
+
+async def deliver(
+    bot: Bot,
+    user_id: Union[int, str],
+    text: str,
+    disable_notification: bool = False,
+    reply_markup: InlineKeyboardMarkup = None,
+    max_attempts: int = 5,
+) -> str:
+    """
+    Отправляет сообщение с повторами при сетевых ошибках.
+
+    Флуд-лимит повторяет RateLimitMiddleware сессии: если он исчерпал попытки,
+    сообщение считается неотправленным.
+
+    :return: SENT, BLOCKED (бот заблокирован или чат не существует) или FAILED.
+    """
+    for attempt in range(max_attempts):
+        try:
+            await bot.send_message(
+                user_id,
+                text,
+                disable_notification=disable_notification,
+                reply_markup=reply_markup,
+            )
+        except exceptions.TelegramRetryAfter as e:
+            logging.error(
+                f"Target [ID:{user_id}]: Flood limit is exceeded, retry after {e.retry_after} seconds."
+            )
+            return FAILED
+        except exceptions.TelegramForbiddenError:
+            logging.error(f"Target [ID:{user_id}]: got TelegramForbiddenError")
+            return BLOCKED
+        except exceptions.TelegramBadRequest as e:
+            if "chat not found" in e.message:
+                logging.error("Telegram server says - Bad Request: chat not found")
+                return BLOCKED
+            logging.error(f"Target [ID:{user_id}]: {e.message}")
+            return FAILED
+        except (exceptions.TelegramNetworkError, exceptions.TelegramServerError):
+            await asyncio.sleep(min(2**attempt, 30))
+        except exceptions.TelegramAPIError:
+            logging.exception(f"Target [ID:{user_id}]: failed")
+            return FAILED
+        else:
+            logging.info(f"Target [ID:{user_id}]: success")
+            return SENT
+
+    logging.error(f"Target [ID:{user_id}]: failed after {max_attempts} attempts")
+    return FAILED
+
 
 async def send_message(
     bot: Bot,
@@ -23,31 +91,202 @@ async def send_message(
     :param reply_markup: reply markup.
     :return: success.
     """
+    return (
+        await deliver(bot, user_id, text, disable_notification, reply_markup) == SENT
+    )
+
+
+@dataclass
+class BroadcastJob:
+    """
+    Рассылка и ее прогресс, сохраняемые между перезапусками.
+    """
+
+    id: str
+    users: list[Union[int, str]]
+    text: str
+    disable_notification: bool = False
+    reply_markup: Optional[dict] = None
+    progress_chat_id: Optional[int] = None
+    progress_message_id: Optional[int] = None
+    done: list[Union[int, str]] = field(default_factory=list)
+    sent: int = 0
+    blocked: int = 0
+    failed: int = 0
+
+
+class BroadcastStore:
+    """
+    JSON-файл с незавершенными рассылками и чатами, заблокировавшими бота.
+
+    Путь задается BROADCAST_STATE_PATH, записи о блокировке старше BLOCKED_TTL удаляются при сохранении.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.jobs: dict[str, BroadcastJob] = {}
+        self.blocked: dict[str, float] = {}
+        self._load()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                state = json.load(file)
+        except (OSError, ValueError):
+            logging.exception(f"Broadcast state {self.path} is unreadable, ignoring it")
+            return
+
+        self.jobs = {
+            job["id"]: BroadcastJob(**job) for job in state.get("jobs", [])
+        }
+        self.blocked = state.get("blocked", {})
+
+    def save(self) -> None:
+        """
+        Атомарно записывает состояние в файл.
+        """
+        now = time.time()
+        self.blocked = {
+            user_id: blocked_at
+            for user_id, blocked_at in self.blocked.items()
+            if now - blocked_at < BLOCKED_TTL
+        }
+        state = {
+            "jobs": [asdict(job) for job in self.jobs.values()],
+            "blocked": self.blocked,
+        }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(state, file, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def is_blocked(self, user_id: Union[int, str]) -> bool:
+        blocked_at = self.blocked.get(str(user_id))
+        return blocked_at is not None and time.time() - blocked_at < BLOCKED_TTL
+
+    def mark_blocked(self, user_id: Union[int, str]) -> None:
+        self.blocked[str(user_id)] = time.time()
+
+    def unmark_blocked(self, user_id: Union[int, str]) -> None:
+        self.blocked.pop(str(user_id), None)
+
+
+_store: Optional[BroadcastStore] = None
+_tasks: set[asyncio.Task] = set()
+
+
+def get_store() -> BroadcastStore:
+    global _store
+    if _store is None:
+        _store = BroadcastStore(config.tg_bot.broadcast_state_path)
+    return _store
+
+
+def progress_text(job: BroadcastJob, finished: bool = False) -> str:
+    total = len(job.users)
+    title = "✅ Рассылка завершена" if finished else "📨 Рассылка"
+    return f"""<b>{title}</b>
+
+Обработано: {len(job.done)} из {total}
+Отправлено: {job.sent}
+Заблокировали бота: {job.blocked}
+Ошибок: {job.failed}"""
+
+
+async def _report_progress(bot: Bot, job: BroadcastJob, finished: bool = False):
+    if job.progress_chat_id is None or job.progress_message_id is None:
+        return
     try:
-        await bot.send_message(
-            user_id,
-            text,
-            disable_notification=disable_notification,
-            reply_markup=reply_markup,
-        )
-    except exceptions.TelegramBadRequest:
-        logging.error("Telegram server says - Bad Request: chat not found")
-    except exceptions.TelegramForbiddenError:
-        logging.error(f"Target [ID:{user_id}]: got TelegramForbiddenError")
-    except exceptions.TelegramRetryAfter as e:
-        logging.error(
-            f"Target [ID:{user_id}]: Flood limit is exceeded. Sleep {e.retry_after} seconds."
+        await bot.edit_message_text(
+            chat_id=job.progress_chat_id,
+            message_id=job.progress_message_id,
+            text=progress_text(job, finished),
         )
-        await asyncio.sleep(e.retry_after)
-        return await send_message(
-            bot, user_id, text, disable_notification, reply_markup
-        )  # Recursive call
-    except exceptions.TelegramAPIError:
-        logging.exception(f"Target [ID:{user_id}]: failed")
-    else:
-        logging.info(f"Target [ID:{user_id}]: success")
-        return True
-    return False
+    except exceptions.TelegramAPIError as e:
+        logging.warning(f"Broadcast {job.id}: progress update failed: {e}")
+
+
+async def run_job(
+    bot: Bot,
+    job: BroadcastJob,
+    concurrency: int = 10,
+    checkpoint_interval: float = 3,
+) -> int:
+    """
+    Выполняет рассылку, пропуская уже обработанные и заблокировавшие бота чаты.
+
+    Сообщения отправляются concurrency воркерами с фоновым приоритетом ограничителя запросов.
+    Прогресс периодически сохраняется в файл и отображается в сообщении администратора.
+
+    :return: Count of messages sent by the job.
+    """
+    store = get_store()
+    store.jobs[job.id] = job
+    store.save()
+
+    reply_markup = (
+        InlineKeyboardMarkup.model_validate(job.reply_markup)
+        if job.reply_markup
+        else None
+    )
+    done = set(job.done)
+    queue: asyncio.Queue = asyncio.Queue()
+    for user_id in job.users:
+        if user_id in done:
+            continue
+        if store.is_blocked(user_id):
+            job.blocked += 1
+            job.done.append(user_id)
+            continue
+        queue.put_nowait(user_id)
+
+    async def worker():
+        while True:
+            try:
+                user_id = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            status = await deliver(
+                bot, user_id, job.text, job.disable_notification, reply_markup
+            )
+            if status == SENT:
+                job.sent += 1
+                store.unmark_blocked(user_id)
+            elif status == BLOCKED:
+                job.blocked += 1
+                store.mark_blocked(user_id)
+            else:
+                job.failed += 1
+            job.done.append(user_id)
+
+    async def checkpoint():
+        while True:
+            await asyncio.sleep(checkpoint_interval)
+            store.save()
+            await _report_progress(bot, job)
+
+    token = request_priority.set(PRIORITY_BACKGROUND)
+    try:
+        workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    finally:
+        request_priority.reset(token)
+
+    checkpoint_task = asyncio.create_task(checkpoint())
+    try:
+        await asyncio.gather(*workers)
+    finally:
+        checkpoint_task.cancel()
+        store.save()
+
+    store.jobs.pop(job.id, None)
+    store.save()
+    await _report_progress(bot, job, finished=True)
+    logging.info(
+        f"Broadcast {job.id}: {job.sent} sent, {job.blocked} blocked, {job.failed} failed."
+    )
+    return job.sent
 
 
 async def broadcast(
@@ -56,27 +295,53 @@ async def broadcast(
     text: str,
     disable_notification: bool = False,
     reply_markup: InlineKeyboardMarkup = None,
+    progress_message=None,
+    concurrency: int = 10,
 ) -> int:
     """
-    Simple broadcaster.
+    Bounded-parallel broadcaster.
     :param bot: Bot instance.
     :param users: List of users.
     :param text: Text of the message.
     :param disable_notification: Disable notification or not.
     :param reply_markup: Reply markup.
+    :param progress_message: Admin message edited with the broadcast progress.
+    :param concurrency: Number of messages sent at the same time.
     :return: Count of messages.
     """
-    count = 0
-    try:
-        for user_id in users:
-            if await send_message(
-                bot, user_id, text, disable_notification, reply_markup
-            ):
-                count += 1
-            await asyncio.sleep(
-                0.05
-            )  # 20 messages per second (Limit: 30 messages per second)
-    finally:
-        logging.info(f"{count} messages successful sent.")
+    job = BroadcastJob(
+        id=uuid.uuid4().hex,
+        users=list(users),
+        text=text,
+        disable_notification=disable_notification,
+        reply_markup=reply_markup.model_dump(exclude_none=True)
+        if reply_markup
+        else None,
+        progress_chat_id=progress_message.chat.id if progress_message else None,
+        progress_message_id=progress_message.message_id if progress_message else None,
+    )
+    return await run_job(bot, job, concurrency)
 
-    return count
+
+def start_broadcast(bot: Bot, users: list[Union[str, int]], text: str, **kwargs) -> asyncio.Task:
+    """
+    Запускает рассылку в фоне, не блокируя вызывающий код.
+    """
+    task = asyncio.create_task(broadcast(bot, users, text, **kwargs))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return task
+
+
+def resume_broadcasts(bot: Bot) -> int:
+    """
+    Продолжает в фоне рассылки, прерванные перезапуском бота.
+
+    :return: Count of resumed broadcasts.
+    """
+    jobs = list(get_store().jobs.values())
+    for job in jobs:
+        task = asyncio.create_task(run_job(bot, job))
+        _tasks.add(task)
+        task.add_done_callback(_tasks.discard)
+    return len(jobs)
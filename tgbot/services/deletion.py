@@ -0,0 +1,90 @@
+import logging
+import math
+import time
+from collections import defaultdict
+from typing import Optional
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramAPIError
+
+from tgbot.services.logger import setup_logging
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+# Максимальное количество сообщений в одном запросе deleteMessages
+DELETE_MESSAGES_LIMIT = 100
+
+
+class DeletionQueue:
+    """
+    Очередь отложенного удаления сообщений.
+
+    Сообщения группируются по чату и сроку удаления, округленному вверх до resolution секунд,
+    и удаляются периодической задачей flush через deleteMessages пачками до 100 сообщений.
+    """
+
+    def __init__(self, resolution: float = 5):
+        self.resolution = resolution
+        self._pending: dict[float, dict[int | str, list[int]]] = defaultdict(
+            lambda: defaultdict(list)
+        )
+
+    def schedule(
+        self, chat_id: int | str, message_ids: list[int], seconds: float = 60
+    ) -> None:
+        """
+        Планирует удаление сообщений через указанное количество секунд.
+        """
+        due = math.ceil((time.monotonic() + seconds) / self.resolution) * self.resolution
+        self._pending[due][chat_id].extend(message_ids)
+
+    def pop_due(self, now: Optional[float] = None) -> dict[int | str, list[int]]:
+        """
+        Извлекает сообщения, срок удаления которых наступил, сгруппированные по чатам.
+        """
+        now = time.monotonic() if now is None else now
+        due_messages: dict[int | str, list[int]] = defaultdict(list)
+        for due in [due for due in self._pending if due <= now]:
+            for chat_id, message_ids in self._pending.pop(due).items():
+                due_messages[chat_id].extend(message_ids)
+        return due_messages
+
+    async def flush(self, bot: Bot) -> None:
+        """
+        Удаляет сообщения, срок удаления которых наступил.
+        """
+        for chat_id, message_ids in self.pop_due().items():
+            for i in range(0, len(message_ids), DELETE_MESSAGES_LIMIT):
+                await self._delete_chunk(
+                    bot, chat_id, message_ids[i : i + DELETE_MESSAGES_LIMIT]
+                )
+
+    @staticmethod
+    async def _delete_chunk(bot: Bot, chat_id: int | str, message_ids: list[int]):
+        try:
+            await bot.delete_messages(chat_id=chat_id, message_ids=message_ids)
+            return
+        except TelegramAPIError as e:
+            logger.warning(
+                f"[Удаление сообщений] Не удалось удалить пачку из {len(message_ids)} сообщений в чате {chat_id}: {e}"
+            )
+
+        # Пачка отклонена целиком - удаляем по одному, чтобы ошибка одного сообщения не мешала остальным
+        for message_id in message_ids:
+            try:
+                await bot.delete_message(chat_id=chat_id, message_id=message_id)
+            except TelegramAPIError as e:
+                logger.warning(
+                    f"[Удаление сообщений] Не удалось удалить сообщение {message_id} в чате {chat_id}: {e}"
+                )
+
+    def __len__(self) -> int:
+        return sum(
+            len(message_ids)
+            for chats in self._pending.values()
+            for message_ids in chats.values()
+        )
+
+
+deletion_queue = DeletionQueue()
@@ -0,0 +1,80 @@
+import asyncio
+import logging
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramAPIError
+
+from infrastructure.database.cache.lru import MISSING, TTLCache
+from tgbot.services.logger import setup_logging
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+
+class CustomEmojiCache:
+    """
+    Кэш бесплатных аналогов премиум эмодзи по custom_emoji_id.
+
+    Соответствие custom_emoji_id и эмодзи не меняется, поэтому записи живут до вытеснения.
+    В API запрашиваются только неизвестные ID, а одновременные запросы одного ID
+    ожидают один общий запрос.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self._emojis: TTLCache[str, str] = TTLCache(maxsize, ttl=float("inf"))
+        self._in_flight: dict[str, asyncio.Future] = {}
+
+    async def resolve(self, bot: Bot, emoji_ids: list[str]) -> list[str]:
+        """
+        Возвращает бесплатные аналоги премиум эмодзи в порядке ID.
+
+        ID, для которых не удалось получить эмодзи, пропускаются.
+        """
+        unique_ids = list(dict.fromkeys(emoji_ids))
+        emojis: dict[str, str] = {}
+        missing: list[str] = []
+        waiting: dict[str, asyncio.Future] = {}
+
+        for emoji_id in unique_ids:
+            emoji = self._emojis.get(emoji_id)
+            if emoji is not MISSING:
+                emojis[emoji_id] = emoji
+            elif emoji_id in self._in_flight:
+                waiting[emoji_id] = self._in_flight[emoji_id]
+            else:
+                missing.append(emoji_id)
+
+        if missing:
+            emojis.update(await self._fetch(bot, missing))
+
+        for emoji_id, future in waiting.items():
+            emoji = await asyncio.shield(future)
+            if emoji is not None:
+                emojis[emoji_id] = emoji
+
+        return [emojis[emoji_id] for emoji_id in unique_ids if emoji_id in emojis]
+
+    async def _fetch(self, bot: Bot, emoji_ids: list[str]) -> dict[str, str]:
+        loop = asyncio.get_running_loop()
+        futures = {emoji_id: loop.create_future() for emoji_id in emoji_ids}
+        self._in_flight.update(futures)
+
+        emojis: dict[str, str] = {}
+        try:
+            stickers = await bot.get_custom_emoji_stickers(custom_emoji_ids=emoji_ids)
+            for sticker in stickers:
+                if sticker.custom_emoji_id and sticker.emoji:
+                    emojis[sticker.custom_emoji_id] = sticker.emoji
+                    self._emojis.set(sticker.custom_emoji_id, sticker.emoji)
+        except TelegramAPIError as e:
+            logger.warning(f"[Эмодзи] Не удалось получить премиум эмодзи {emoji_ids}: {e}")
+        finally:
+            for emoji_id, future in futures.items():
+                self._in_flight.pop(emoji_id, None)
+                if not future.done():
+                    future.set_result(emojis.get(emoji_id))
+
+        return emojis
+
+
+custom_emojis = CustomEmojiCache()
@@ -0,0 +1,70 @@
+import logging
+
+from aiogram import Bot
+
+from infrastructure.database.cache.lru import TTLCache
+from tgbot.services.logger import setup_logging
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+
+class ForumGuard:
+    """
+    Негативный кэш пользователей, заблокированных в форуме.
+
+    Хранит ID незарегистрированных пользователей и пользователей с неподходящей ролью, которые уже были заблокированы,
+    а также ID, блокировка которых выполняется прямо сейчас. Повторные события от таких пользователей
+    отбрасываются без запросов к БД и Telegram.
+    """
+
+    def __init__(
+        self, ttl: float = 24 * 60 * 60, retry_ttl: float = 60, maxsize: int = 10000
+    ):
+        self.retry_ttl = retry_ttl
+        self._blocked: TTLCache[int, bool] = TTLCache(maxsize, ttl)
+        self._in_flight: set[int] = set()
+        self.dropped = 0
+
+    def is_blocked(self, user_id: int) -> bool:
+        """
+        Проверка, заблокирован ли пользователь или блокируется ли он в данный момент.
+        """
+        blocked = user_id in self._in_flight or user_id in self._blocked
+        if blocked:
+            self.dropped += 1
+        return blocked
+
+    async def block(self, bot: Bot, chat_id: int | str, user_id: int, notice: str) -> bool:
+        """
+        Блокирует пользователя в форуме и публикует уведомление о блокировке.
+
+        Одновременные вызовы для одного пользователя выполняют блокировку только один раз.
+
+        Returns:
+            bool: True если блокировку выполнил этот вызов
+        """
+        if user_id in self._in_flight or user_id in self._blocked:
+            return False
+
+        self._in_flight.add(user_id)
+        try:
+            await bot.ban_chat_member(chat_id=chat_id, user_id=user_id)
+            await bot.send_message(chat_id=chat_id, text=notice)
+            self._blocked.set(user_id, True)
+        except Exception as e:
+            # Не повторяем неудачную блокировку на каждое сообщение, но и не запоминаем надолго
+            self._blocked.set(user_id, True, ttl=self.retry_ttl)
+            logger.error(f"[Форум] Ошибка при блокировке пользователя {user_id}: {e}")
+        finally:
+            self._in_flight.discard(user_id)
+        return True
+
+    def forget(self, user_id: int) -> None:
+        """
+        Удаляет пользователя из негативного кэша, например после ручной разблокировки.
+        """
+        self._blocked.pop(user_id)
+
+
+forum_guard = ForumGuard()
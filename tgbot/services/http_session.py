@@ -0,0 +1,139 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from typing import Any, Optional
+
+from aiogram import Bot, __version__
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.methods import TelegramMethod
+from aiogram.methods.base import TelegramType
+from aiohttp import ClientSession, TCPConnector, TraceConfig
+from aiohttp.hdrs import USER_AGENT
+from aiohttp.http import SERVER_SOFTWARE
+
+from tgbot.config import HttpConfig
+from tgbot.services.logger import setup_logging
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+
+class MethodLatency:
+    __slots__ = ("count", "errors", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, elapsed: float, error: bool) -> None:
+        self.count += 1
+        self.errors += error
+        self.total += elapsed
+        self.max = max(self.max, elapsed)
+
+
+class TunedAiohttpSession(AiohttpSession):
+    """
+    HTTP сессия Bot API с настраиваемым пулом соединений и метриками.
+
+    Соединения переиспользуются в течение keepalive_timeout, DNS кэшируется на dns_ttl секунд,
+    а таймаут запроса можно задать отдельно для каждого метода. Счетчики созданных и
+    переиспользованных соединений и задержки по методам доступны через stats().
+
+    Собственная ClientSession создается только через публичные create_session и close,
+    не завися от внутреннего устройства AiohttpSession.
+    """
+
+    def __init__(self, http: HttpConfig, **kwargs: Any):
+        super().__init__(timeout=http.timeout, **kwargs)
+        self.http = http
+        self.method_timeouts = http.method_timeouts
+        self._client: Optional[ClientSession] = None
+
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.in_flight = 0
+        self.latency: dict[str, MethodLatency] = defaultdict(MethodLatency)
+
+        self._trace_config = TraceConfig()
+        self._trace_config.on_connection_create_end.append(self._on_connection_created)
+        self._trace_config.on_connection_reuseconn.append(self._on_connection_reused)
+
+    async def _on_connection_created(self, *_: Any) -> None:
+        self.connections_created += 1
+
+    async def _on_connection_reused(self, *_: Any) -> None:
+        self.connections_reused += 1
+
+    async def create_session(self) -> ClientSession:
+        if self._client is None or self._client.closed:
+            self._client = ClientSession(
+                connector=TCPConnector(
+                    limit=self.http.limit,
+                    limit_per_host=self.http.limit_per_host,
+                    keepalive_timeout=self.http.keepalive_timeout,
+                    ttl_dns_cache=self.http.dns_ttl,
+                ),
+                headers={
+                    USER_AGENT: f"{SERVER_SOFTWARE} aiogram/{__version__}",
+                },
+                trace_configs=[self._trace_config],
+            )
+        return self._client
+
+    async def close(self) -> None:
+        if self._client is not None and not self._client.closed:
+            await self._client.close()
+            # Даем SSL соединениям закрыться, как это делает AiohttpSession
+            await asyncio.sleep(0.25)
+        await super().close()
+
+    async def make_request(
+        self,
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+        timeout: Optional[int] = None,
+    ) -> TelegramType:
+        api_method = method.__api_method__
+        if timeout is None:
+            timeout = self.method_timeouts.get(api_method)
+
+        started = time.monotonic()
+        error = True
+        self.in_flight += 1
+        try:
+            result = await super().make_request(bot, method, timeout)
+            error = False
+            return result
+        finally:
+            self.in_flight -= 1
+            self.latency[api_method].add(time.monotonic() - started, error)
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Метрики сессии: соединения, запросы в работе и задержки по методам в миллисекундах.
+        """
+        return {
+            "connections_created": self.connections_created,
+            "connections_reused": self.connections_reused,
+            "in_flight": self.in_flight,
+            "methods": {
+                api_method: {
+                    "count": latency.count,
+                    "errors": latency.errors,
+                    "avg_ms": round(latency.total / latency.count * 1000, 1),
+                    "max_ms": round(latency.max * 1000, 1),
+                }
+                for api_method, latency in self.latency.items()
+                if latency.count
+            },
+        }
+
+    def log_stats(self) -> None:
+        """
+        Пишет метрики сессии в лог.
+        """
+        logger.info(f"[HTTP] {self.stats()}")
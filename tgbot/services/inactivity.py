@@ -0,0 +1,183 @@
+import datetime
+import heapq
+import itertools
+import time
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from tgbot.config import load_config
+
+config = load_config(".env")
+
+
+@dataclass(slots=True)
+class _Activity:
+    last_activity: float
+    generation: int
+    warned: bool = False
+
+
+class InactivityTracker:
+    """
+    Отслеживание неактивности вопросов.
+
+    Сообщение в вопросе только обновляет время последней активности в словаре. Сроки
+    предупреждения и автозакрытия хранятся в куче и проверяются одной периодической задачей:
+    устаревшие записи кучи переносятся на актуальный срок при извлечении.
+
+    Новое время активности копится в pending и сохраняется в БД пакетом при проверке,
+    чтобы после перезапуска сроки можно было восстановить через restore.
+    """
+
+    def __init__(self, warn_after: float, close_after: float):
+        self.warn_after = warn_after
+        self.close_after = close_after
+        self._questions: dict[str, _Activity] = {}
+        self._deadlines: list[tuple[float, int, str]] = []
+        self._generations = itertools.count()
+        self._pending: dict[str, datetime.datetime] = {}
+
+    def _track(self, token: str, last_activity: float) -> None:
+        generation = next(self._generations)
+        self._questions[token] = _Activity(last_activity, generation)
+        heapq.heappush(
+            self._deadlines, (last_activity + self.warn_after, generation, token)
+        )
+
+    def touch(self, token: str, now: Optional[float] = None) -> None:
+        """
+        Отмечает активность в вопросе, начиная отслеживание при необходимости.
+        """
+        now = time.monotonic() if now is None else now
+        self._pending[token] = datetime.datetime.now()
+
+        activity = self._questions.get(token)
+        if activity is None:
+            self._track(token, now)
+            return
+
+        if activity.warned:
+            # После предупреждения в очереди остался только срок закрытия по старой активности,
+            # который может наступить позже нового срока предупреждения. Новое поколение
+            # отбрасывает старую запись, чтобы записи вопроса не копились в очереди
+            activity.generation = next(self._generations)
+            heapq.heappush(
+                self._deadlines, (now + self.warn_after, activity.generation, token)
+            )
+
+        activity.last_activity = now
+        activity.warned = False
+
+    def stop(self, token: str) -> None:
+        """
+        Прекращает отслеживание вопроса. Запись в куче удаляется при следующей проверке.
+        """
+        self._questions.pop(token, None)
+        self._pending.pop(token, None)
+
+    def restore(
+        self, activity: Iterable[tuple[str, Optional[datetime.datetime]]]
+    ) -> None:
+        """
+        Восстанавливает отслеживание вопросов по сохраненному времени последней активности.
+
+        Истекшие за время простоя сроки будут обработаны ближайшей проверкой. Вопрос без
+        сохраненного времени активности отслеживается с момента восстановления.
+        """
+        now = time.monotonic()
+        wall_now = datetime.datetime.now()
+        for token, last_activity in activity:
+            if token in self._questions:
+                continue
+            if last_activity is None:
+                self._track(token, now)
+                continue
+            elapsed = (wall_now - last_activity).total_seconds()
+            self._track(token, now - elapsed)
+
+    def pop_pending(self) -> dict[str, datetime.datetime]:
+        """
+        Извлекает время активности, еще не сохраненное в БД.
+        """
+        pending, self._pending = self._pending, {}
+        return {
+            token: last_activity
+            for token, last_activity in pending.items()
+            if token in self._questions
+        }
+
+    def return_pending(self, pending: dict[str, datetime.datetime]) -> None:
+        """
+        Возвращает несохраненное время активности, не перезаписывая более новые значения.
+        """
+        for token, last_activity in pending.items():
+            if token in self._questions:
+                self._pending.setdefault(token, last_activity)
+
+    def return_due(
+        self,
+        to_warn: Iterable[str],
+        to_close: Iterable[str],
+        now: Optional[float] = None,
+    ) -> None:
+        """
+        Возвращает необработанные результаты sweep, чтобы следующая проверка обработала их снова.
+        """
+        now = time.monotonic() if now is None else now
+        for token in to_warn:
+            activity = self._questions.get(token)
+            if activity is not None and activity.warned:
+                activity.warned = False
+                heapq.heappush(self._deadlines, (now, activity.generation, token))
+
+        for token in to_close:
+            if token not in self._questions:
+                self._track(token, now - self.close_after)
+
+    def sweep(self, now: Optional[float] = None) -> tuple[list[str], list[str]]:
+        """
+        Извлекает вопросы, у которых наступил срок предупреждения или автозакрытия.
+
+        Вопросы на автозакрытие перестают отслеживаться. Если обработать их не удалось,
+        их нужно вернуть через return_due.
+
+        Returns:
+            tuple[list[str], list[str]]: Токены вопросов для предупреждения и для закрытия
+        """
+        now = time.monotonic() if now is None else now
+        to_warn, to_close = [], []
+
+        while self._deadlines and self._deadlines[0][0] <= now:
+            _, generation, token = heapq.heappop(self._deadlines)
+            activity = self._questions.get(token)
+            if activity is None or activity.generation != generation:
+                continue
+
+            warn_at = activity.last_activity + self.warn_after
+            close_at = activity.last_activity + self.close_after
+
+            if close_at <= now:
+                del self._questions[token]
+                to_close.append(token)
+                continue
+
+            if warn_at <= now and not activity.warned:
+                activity.warned = True
+                to_warn.append(token)
+
+            next_deadline = close_at if activity.warned else warn_at
+            heapq.heappush(self._deadlines, (next_deadline, generation, token))
+
+        return to_warn, to_close
+
+    def __contains__(self, token: str) -> bool:
+        return token in self._questions
+
+    def __len__(self) -> int:
+        return len(self._questions)
+
+
+inactivity_tracker = InactivityTracker(
+    warn_after=config.tg_bot.activity_warn_minutes * 60,
+    close_after=config.tg_bot.activity_close_minutes * 60,
+)
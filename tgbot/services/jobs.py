@@ -0,0 +1,81 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Optional
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from infrastructure.database.repo.requests import RequestsRepo
+from tgbot.services.logger import setup_logging
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+_DEFAULT = object()
+
+
+class JobRunner:
+    """
+    Запуск отложенных задач планировщика с собственной сессией БД.
+
+    Задачи не получают репозиторий в аргументах при планировании: сессия хэндлера закрывается
+    сразу после выхода из DatabaseMiddleware. Вместо этого каждая задача на время выполнения
+    получает новую сессию из пула в аргументе repo. Количество одновременно выполняемых задач
+    и время выполнения каждой ограничены.
+    """
+
+    def __init__(self, timeout: Optional[float] = 60, concurrency: int = 10):
+        self.timeout = timeout
+        self.session_pool: Optional[async_sessionmaker] = None
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    def setup(self, session_pool: async_sessionmaker) -> None:
+        """
+        Устанавливает пул сессий, из которого задачи получают подключения.
+        """
+        self.session_pool = session_pool
+
+    async def run(
+        self,
+        job: Callable[..., Awaitable[Any]],
+        *args: Any,
+        timeout: Optional[float] = _DEFAULT,
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Выполняет задачу, передавая ей репозиторий с новой сессией.
+
+        Незафиксированные изменения откатываются при закрытии сессии, в том числе
+        если задача упала или не уложилась в таймаут.
+
+        Args:
+            job: Корутинная функция задачи, принимающая аргумент repo
+            timeout (float, optional): Таймаут задачи в секундах, None - без ограничения
+
+        Returns:
+            Результат задачи или None при ошибке
+        """
+        if self.session_pool is None:
+            raise RuntimeError("JobRunner не настроен: не задан пул сессий")
+
+        if timeout is _DEFAULT:
+            timeout = self.timeout
+
+        async with self._semaphore:
+            async with self.session_pool() as session:
+                repo = RequestsRepo(session)
+                try:
+                    return await asyncio.wait_for(
+                        job(*args, repo=repo, **kwargs), timeout
+                    )
+                except asyncio.TimeoutError:
+                    logger.error(
+                        f"[Планировщик] Задача {job.__name__} не завершилась за {timeout} с."
+                    )
+                except Exception as e:
+                    logger.exception(
+                        f"[Планировщик] Ошибка при выполнении задачи {job.__name__}: {e}"
+                    )
+        return None
+
+
+job_runner = JobRunner()
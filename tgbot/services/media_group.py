@@ -0,0 +1,58 @@
+import asyncio
+import time
+from typing import Optional
+
+from aiogram.types import Message
+
+from tgbot.config import load_config
+
+config = load_config(".env")
+
+
+class _Album:
+    __slots__ = ("messages", "updated")
+
+    def __init__(self, message: Message):
+        self.messages = [message]
+        self.updated = time.monotonic()
+
+
+class MediaGroupCollector:
+    """
+    Сборка альбомов из отдельных обновлений.
+
+    Telegram присылает каждое сообщение альбома отдельным обновлением с общим media_group_id.
+    Первое сообщение альбома ждет, пока в течение delay секунд не перестанут приходить новые,
+    и возвращает все сообщения альбома для пересылки одним copy_messages. Остальные
+    сообщения альбома получают None и дальше не обрабатываются.
+    """
+
+    def __init__(self, delay: float = 0.5):
+        self.delay = delay
+        self._albums: dict[tuple[int, str], _Album] = {}
+
+    async def collect(self, message: Message) -> Optional[list[Message]]:
+        """
+        Добавляет сообщение в альбом.
+
+        Returns:
+            Optional[list[Message]]: Сообщения альбома по порядку для первого сообщения, иначе None
+        """
+        key = (message.chat.id, message.media_group_id)
+        album = self._albums.get(key)
+        if album is not None:
+            album.messages.append(message)
+            album.updated = time.monotonic()
+            return None
+
+        album = self._albums[key] = _Album(message)
+        try:
+            while (wait := album.updated + self.delay - time.monotonic()) > 0:
+                await asyncio.sleep(wait)
+        finally:
+            del self._albums[key]
+
+        return sorted(album.messages, key=lambda part: part.message_id)
+
+
+media_groups = MediaGroupCollector(delay=config.tg_bot.media_group_delay)
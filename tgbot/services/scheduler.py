@@ -1,18 +1,23 @@
+import asyncio
 import datetime
 import logging
 
 import pytz
 from aiogram import Bot
+from aiogram.exceptions import TelegramAPIError, TelegramBadRequest
 from aiogram.types import ReplyKeyboardRemove
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from sqlalchemy import Sequence
 
 from infrastructure.database.models import Question
 from infrastructure.database.repo.requests import RequestsRepo
 from tgbot.config import load_config
 from tgbot.keyboards.user.main import closed_dialog_kb
+from tgbot.middlewares.rate_limit import PRIORITY_BACKGROUND, request_priority
 from tgbot.misc import dicts
+from tgbot.services.inactivity import inactivity_tracker
+from tgbot.services.jobs import job_runner
 from tgbot.services.logger import setup_logging
+from tgbot.services.side_effects import SideEffects
 
 scheduler = AsyncIOScheduler(timezone=pytz.utc)
 config = load_config(".env")
@@ -20,66 +25,121 @@ config = load_config(".env")
 setup_logging()
 logger = logging.getLogger(__name__)
 
+# Период проверки сроков неактивности вопросов
+INACTIVITY_SWEEP_SECONDS = 15
 
-async def delete_messages(bot: Bot, chat_id: int, message_ids: list[int]):
-    """Удаляет список сообщений."""
-    try:
-        for message_id in message_ids:
-            await bot.delete_message(chat_id=chat_id, message_id=message_id)
-    except Exception as e:
-        print(f"Ошибка при удалении сообщений: {e}")
-
-
-async def run_delete_timer(
-    bot: Bot, chat_id: int, message_ids: list[int], seconds: int = 60
-):
-    """Delete messages after timer. Default - 60 seconds."""
-    try:
-        scheduler.add_job(
-            delete_messages,
-            "date",
-            run_date=datetime.datetime.now(tz=pytz.utc)
-            + datetime.timedelta(seconds=seconds),
-            args=[bot, chat_id, message_ids],
-        )
-    except Exception as e:
-        print(f"Ошибка при планировании удаления сообщений: {e}")
+# Параметры очистки старых вопросов
+PURGE_CHUNK_SIZE = 200
+PURGE_CONCURRENCY = 5
+PURGE_REQUEST_INTERVAL = 0.2
+PURGE_MAX_CHUNKS = 10
+PURGE_TIMEOUT = 30 * 60
 
 
-async def remove_question_timer(bot: Bot, question: Question, repo: RequestsRepo):
+async def remove_question_timer(bot: Bot, question: Question):
     warning_job_id = f"remove_{question.Token}"
     scheduler.add_job(
-        remove_question,
+        job_runner.run,
         "date",
         run_date=datetime.datetime.now(tz=pytz.utc) + datetime.timedelta(seconds=30),
-        args=[bot, question, repo],
+        args=[remove_question, bot, question.Token, question.TopicId],
         id=warning_job_id,
     )
 
 
-async def remove_question(bot: Bot, question: Question, repo: RequestsRepo):
-    await repo.questions.delete_question(token=question.Token)
+async def remove_question(
+    bot: Bot, question_token: str, topic_id: int, repo: RequestsRepo
+):
+    await repo.questions.delete_question(token=question_token)
+    await repo.commit()
 
     await bot.delete_forum_topic(
-        chat_id=config.tg_bot.forum_id, message_thread_id=question.TopicId
+        chat_id=config.tg_bot.forum_id, message_thread_id=topic_id
     )
 
 
-async def remove_old_topics(bot: Bot, repo: RequestsRepo):
-    old_questions: Sequence[Question] = await repo.questions.get_old_questions()
+async def delete_forum_topic_safe(
+    bot: Bot, topic_id: int, semaphore: asyncio.Semaphore
+) -> bool:
+    """
+    Удаляет топик форума с ограничением параллельности и частоты запросов.
+
+    Уже удаленный топик считается успешно удаленным, чтобы повторный проход
+    после сбоя не застревал на нем. Повтор при превышении лимитов выполняет
+    RateLimitMiddleware сессии, любая другая ошибка Telegram только логируется,
+    чтобы не прерывать обработку остальных топиков порции.
+
+    Returns:
+        bool: True, если топика больше нет на форуме
+    """
+    async with semaphore:
+        try:
+            await bot.delete_forum_topic(
+                chat_id=config.tg_bot.forum_id, message_thread_id=topic_id
+            )
+            return True
+        except TelegramBadRequest as e:
+            message = e.message.lower()
+            if "topic_id_invalid" in message or "thread not found" in message:
+                return True
+            logger.warning(f"[Старые топики] Не удалось удалить топик {topic_id}: {e}")
+            return False
+        except TelegramAPIError as e:
+            logger.warning(f"[Старые топики] Не удалось удалить топик {topic_id}: {e}")
+            return False
+        finally:
+            await asyncio.sleep(PURGE_REQUEST_INTERVAL)
 
-    for question in old_questions:
-        await bot.delete_forum_topic(
-            chat_id=config.tg_bot.forum_id, message_thread_id=question.TopicId
-        )
 
-    result = await repo.questions.delete_question(dialogs=old_questions)
-    logger.info(
-        f"[Старые топики] Успешно удалено {result['deleted_count']} из {result['total_count']} старых вопросов"
-    )
-    if result["errors"]:
+async def remove_old_topics(bot: Bot, repo: RequestsRepo):
+    """
+    Удаляет вопросы старше 2 месяцев вместе с их топиками.
+
+    Вопросы обрабатываются порциями по PURGE_CHUNK_SIZE в порядке (StartTime, Token).
+    Каждая порция удаляется одним запросом и фиксируется отдельной транзакцией,
+    поэтому после сбоя следующий запуск продолжает с первого неудаленного вопроса.
+    Во время запросов к Telegram транзакция не держится открытой.
+    За один запуск обрабатывается не больше PURGE_MAX_CHUNKS порций, остаток и вопросы,
+    топики которых удалить не удалось, остаются до следующего запуска.
+    Запросы к Telegram идут с фоновым приоритетом и не задерживают ответы пользователям.
+    """
+    before = datetime.datetime.now() - datetime.timedelta(days=60)
+    semaphore = asyncio.Semaphore(PURGE_CONCURRENCY)
+    cursor = None
+    deleted_count = 0
+    failed_count = 0
+
+    token = request_priority.set(PRIORITY_BACKGROUND)
+    try:
+        for _ in range(PURGE_MAX_CHUNKS):
+            keys = await repo.questions.get_old_question_keys(
+                before=before, limit=PURGE_CHUNK_SIZE, after=cursor
+            )
+            if not keys:
+                break
+            cursor = (keys[-1].StartTime, keys[-1].Token)
+            # Завершаем читающую транзакцию до удаления топиков
+            await repo.commit()
+
+            results = await asyncio.gather(
+                *(delete_forum_topic_safe(bot, key.TopicId, semaphore) for key in keys)
+            )
+            tokens = [key.Token for key, removed in zip(keys, results) if removed]
+            failed_count += len(keys) - len(tokens)
+
+            deleted_count += await repo.questions.delete_questions(tokens)
+            await repo.commit()
+        else:
+            logger.info(
+                f"[Старые топики] Обработано {PURGE_MAX_CHUNKS} порций, остальные вопросы будут удалены при следующем запуске"
+            )
+    finally:
+        request_priority.reset(token)
+
+    logger.info(f"[Старые топики] Успешно удалено {deleted_count} старых вопросов")
+    if failed_count:
         logger.info(
-            f"[Старые топики] Произошла ошибка при удалении части вопросов: {result['errors']}"
+            f"[Старые топики] Не удалось удалить топики {failed_count} вопросов, они будут удалены при следующем запуске"
         )
 
 
@@ -108,110 +168,109 @@ async def send_inactivity_warning(bot: Bot, question_token: str, repo: RequestsR
         )
 
 
-async def auto_close_question(bot: Bot, question_token: str, repo: RequestsRepo):
-    """Автоматически закрывает вопрос через 10 минут неактивности."""
+async def auto_close_question(
+    bot: Bot, question_token: str, repo: RequestsRepo
+) -> bool:
+    """
+    Автоматически закрывает вопрос через 10 минут неактивности.
+
+    Returns:
+        bool: False, если закрыть вопрос в БД не удалось и его нужно повторить
+    """
     try:
         question: Question = await repo.questions.get_question(token=question_token)
 
-        if question and question.Status in ["open", "in_progress"]:
-            # Закрываем вопрос
-            await repo.questions.update_question_status(
-                token=question_token, status="closed"
-            )
-            await repo.questions.update_question_end(
-                token=question_token, end_time=datetime.datetime.now()
-            )
+        if question and await repo.questions.close(
+            token=question_token, end_time=datetime.datetime.now()
+        ):
+            await repo.commit()
+
+            effects = SideEffects(f"Автозакрытие вопроса {question_token}")
 
             # Обновляем топик
-            await bot.edit_forum_topic(
-                chat_id=config.tg_bot.forum_id,
-                message_thread_id=question.TopicId,
-                name=question.Token,
-                icon_custom_emoji_id=dicts.topicEmojis["closed"],
+            effects.add(
+                "edit_topic",
+                lambda: bot.edit_forum_topic(
+                    chat_id=config.tg_bot.forum_id,
+                    message_thread_id=question.TopicId,
+                    name=question.Token,
+                    icon_custom_emoji_id=dicts.topicEmojis["closed"],
+                ),
             )
-            await bot.close_forum_topic(
-                chat_id=config.tg_bot.forum_id, message_thread_id=question.TopicId
+            effects.add(
+                "close_topic",
+                lambda: bot.close_forum_topic(
+                    chat_id=config.tg_bot.forum_id, message_thread_id=question.TopicId
+                ),
+                after=["edit_topic"],
             )
 
             # Уведомляем о закрытии
-            await bot.send_message(
-                chat_id=config.tg_bot.forum_id,
-                message_thread_id=question.TopicId,
-                text="🔒 <b>Вопрос автоматически закрыт</b>\n\nВопрос был закрыт из-за отсутствия активности в течение 10 минут",
-                reply_markup=closed_dialog_kb(token=question_token, role="duty"),
+            effects.add(
+                "duty_notice",
+                lambda: bot.send_message(
+                    chat_id=config.tg_bot.forum_id,
+                    message_thread_id=question.TopicId,
+                    text="🔒 <b>Вопрос автоматически закрыт</b>\n\nВопрос был закрыт из-за отсутствия активности в течение 10 минут",
+                    reply_markup=closed_dialog_kb(token=question_token, role="duty"),
+                ),
             )
-
-            await bot.send_message(
-                chat_id=question.EmployeeChatId,
-                text="🔒 <b>Вопрос автоматически закрыт</b>",
-                reply_markup=ReplyKeyboardRemove(),
+            effects.add(
+                "employee_notice",
+                lambda: bot.send_message(
+                    chat_id=question.EmployeeChatId,
+                    text="🔒 <b>Вопрос автоматически закрыт</b>",
+                    reply_markup=ReplyKeyboardRemove(),
+                ),
             )
-            await bot.send_message(
-                chat_id=question.EmployeeChatId,
-                text="Твой вопрос был закрыт из-за отсутствия активности в течение 10 минут",
-                reply_markup=closed_dialog_kb(token=question_token, role="employee"),
+            effects.add(
+                "employee_rating",
+                lambda: bot.send_message(
+                    chat_id=question.EmployeeChatId,
+                    text="Твой вопрос был закрыт из-за отсутствия активности в течение 10 минут",
+                    reply_markup=closed_dialog_kb(token=question_token, role="employee"),
+                ),
+                after=["employee_notice"],
             )
+            await effects.run()
 
     except Exception as e:
+        await repo.session.rollback()
         logger.error(
             f"[Таймер неактивности] Ошибка при автоматическом закрытии вопроса {question_token}: {e}"
         )
+        return False
+    return True
 
 
-def start_inactivity_timer(question_token: str, bot: Bot, repo: RequestsRepo):
-    """Запускает таймер неактивности для вопроса."""
+async def sweep_inactive_questions(bot: Bot, repo: RequestsRepo):
+    """
+    Сохраняет время активности вопросов, отправляет предупреждения и закрывает вопросы,
+    в которых истек срок неактивности.
+    """
+    pending = inactivity_tracker.pop_pending()
     try:
-        # Удаляем существующие задачи для этого вопроса
-        stop_inactivity_timer(question_token)
-
-        # Запускаем таймер предупреждения (5 минут)
-        warning_job_id = f"warning_{question_token}"
-        scheduler.add_job(
-            send_inactivity_warning,
-            "date",
-            run_date=datetime.datetime.now(tz=pytz.utc)
-            + datetime.timedelta(minutes=config.tg_bot.activity_warn_minutes),
-            args=[bot, question_token, repo],
-            id=warning_job_id,
-        )
-
-        # Запускаем таймер автозакрытия (10 минут)
-        close_job_id = f"close_{question_token}"
-        scheduler.add_job(
-            auto_close_question,
-            "date",
-            run_date=datetime.datetime.now(tz=pytz.utc)
-            + datetime.timedelta(minutes=config.tg_bot.activity_close_minutes),
-            args=[bot, question_token, repo],
-            id=close_job_id,
-        )
-
+        await repo.questions.set_last_activity(pending)
+        await repo.commit()
     except Exception as e:
+        await repo.session.rollback()
+        inactivity_tracker.return_pending(pending)
         logger.error(
-            f"[Таймер неактивности] Ошибка при запуске таймера для вопроса {question_token}: {e}"
+            f"[Таймер неактивности] Ошибка при сохранении времени активности: {e}"
         )
 
+    to_warn, to_close = inactivity_tracker.sweep()
+    failed = []
 
-def stop_inactivity_timer(question_token: str):
-    """Останавливает таймер неактивности для вопроса."""
+    # При отмене задачи необработанные вопросы возвращаются в трекер, а не теряются
     try:
-        warning_job_id = f"warning_{question_token}"
-        close_job_id = f"close_{question_token}"
-
-        # Удаляем задачи если они существуют
-        if scheduler.get_job(warning_job_id):
-            scheduler.remove_job(warning_job_id)
-
-        if scheduler.get_job(close_job_id):
-            scheduler.remove_job(close_job_id)
-
-    except Exception as e:
-        logger.error(
-            f"[Таймер неактивности] Ошибка при остановке таймера для вопроса {question_token}: {e}"
-        )
-
-
-def restart_inactivity_timer(question_token: str, bot: Bot, repo: RequestsRepo):
-    """Перезапускает таймер неактивности для вопроса."""
-    stop_inactivity_timer(question_token)
-    start_inactivity_timer(question_token, bot, repo)
+        while to_warn:
+            await send_inactivity_warning(bot, to_warn[0], repo)
+            to_warn.pop(0)
+
+        while to_close:
+            if not await auto_close_question(bot, to_close[0], repo):
+                failed.append(to_close[0])
+            to_close.pop(0)
+    finally:
+        inactivity_tracker.return_due(to_warn, to_close + failed)
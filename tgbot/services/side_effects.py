@@ -0,0 +1,74 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Iterable
+
+from tgbot.services.logger import setup_logging
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+
+class SideEffects:
+    """
+    Параллельное выполнение независимых вызовов Bot API.
+
+    Вызовы запускаются одновременно, кроме тех, что должны идти после других (after):
+    такой вызов ждет завершения своих зависимостей, даже если они упали. Ошибка одного
+    вызова не прерывает остальные - ошибки собираются и логируются по каждому вызову.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: dict[str, tuple[Callable[[], Awaitable[Any]], tuple[str, ...]]] = {}
+
+    def add(
+        self,
+        key: str,
+        call: Callable[[], Awaitable[Any]],
+        after: Iterable[str] = (),
+    ) -> "SideEffects":
+        """
+        Добавляет вызов.
+
+        Args:
+            key (str): Имя вызова для зависимостей и логов
+            call: Функция без аргументов, возвращающая корутину вызова
+            after (Iterable[str]): Имена вызовов, которые должны завершиться раньше
+        """
+        after = tuple(after)
+        for dependency in after:
+            if dependency not in self._calls:
+                raise ValueError(f"Неизвестная зависимость {dependency} для {key}")
+        self._calls[key] = (call, after)
+        return self
+
+    async def run(self) -> dict[str, BaseException]:
+        """
+        Выполняет все вызовы.
+
+        Returns:
+            dict[str, BaseException]: Ошибки по именам упавших вызовов
+        """
+        tasks: dict[str, asyncio.Task] = {}
+
+        async def run_call(call: Callable[[], Awaitable[Any]], after: tuple[str, ...]):
+            if after:
+                await asyncio.gather(
+                    *(tasks[dependency] for dependency in after),
+                    return_exceptions=True,
+                )
+            return await call()
+
+        for key, (call, after) in self._calls.items():
+            tasks[key] = asyncio.create_task(run_call(call, after))
+
+        results = await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+        errors = {
+            key: result
+            for key, result in zip(tasks, results)
+            if isinstance(result, BaseException)
+        }
+        for key, error in errors.items():
+            logger.error(f"[{self.name}] Ошибка при выполнении {key}: {error}")
+        return errors
@@ -0,0 +1,155 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Optional
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramAPIError, TelegramBadRequest
+
+from infrastructure.database.repo.requests import RequestsRepo
+from tgbot.config import load_config
+from tgbot.middlewares.rate_limit import PRIORITY_BACKGROUND, request_priority
+from tgbot.services.logger import setup_logging
+
+config = load_config(".env")
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+# Название свободной темы в пуле
+POOL_TOPIC_NAME = "⏳ Свободная тема"
+
+
+class TopicPool:
+    """
+    Пул заранее созданных тем форума.
+
+    Новый вопрос забирает свободную тему без запроса к Telegram и переименовывает ее уже после
+    ответа специалисту. Пул пополняется в фоне до size тем, при size = 0 пул отключен.
+    Сообщения в свободных темах не относятся ни к одному вопросу и должны игнорироваться.
+
+    Свободные темы хранятся в БД: после перезапуска, в том числе аварийного, restore снова
+    берет их в пул, а темы сверх size удаляет. Тема, взятая через take, должна быть удалена
+    из БД в той же транзакции, что и добавление вопроса (TopicPoolRepo.remove_topics).
+    """
+
+    def __init__(self, size: int = 0):
+        self.size = size
+        self._topics: deque[int] = deque()
+        self._refill_task: Optional[asyncio.Task] = None
+        self._session_pool = None
+
+    def setup(self, session_pool) -> None:
+        self._session_pool = session_pool
+
+    def is_pooled(self, topic_id: Optional[int]) -> bool:
+        """
+        Проверка, является ли тема свободной темой пула.
+        """
+        return topic_id in self._topics
+
+    def take(self, bot: Bot) -> Optional[int]:
+        """
+        Забирает свободную тему из пула и запускает его пополнение.
+
+        Returns:
+            Optional[int]: ID темы или None, если пул пуст
+        """
+        topic_id = self._topics.popleft() if self._topics else None
+        self.refill(bot)
+        return topic_id
+
+    async def restore(self, bot: Bot) -> None:
+        """
+        Загружает сохраненные свободные темы, удаляет лишние и запускает пополнение пула.
+        """
+        async with self._session_pool() as session:
+            repo = RequestsRepo(session)
+            topic_ids = list(await repo.topic_pool.get_topic_ids())
+
+            # Лишние темы, которые не удалось удалить, останутся в БД до следующего запуска
+            excess = topic_ids[self.size :]
+            deleted = [
+                topic_id for topic_id in excess if await self._delete_topic(bot, topic_id)
+            ]
+            await repo.topic_pool.remove_topics(deleted)
+            await repo.commit()
+
+        self._topics.extend(topic_ids[: self.size])
+        logger.info(
+            f"[Пул тем] Восстановлено свободных тем: {len(self._topics)}, удалено лишних: {len(deleted)}"
+        )
+        self.refill(bot)
+
+    def refill(self, bot: Bot) -> None:
+        """
+        Запускает фоновое пополнение пула, если оно еще не идет.
+
+        Темы создаются с фоновым приоритетом и не задерживают ответы пользователям.
+        """
+        if self._session_pool is None or len(self._topics) >= self.size:
+            return
+        if self._refill_task is None or self._refill_task.done():
+            token = request_priority.set(PRIORITY_BACKGROUND)
+            try:
+                self._refill_task = asyncio.create_task(self._refill(bot))
+            finally:
+                request_priority.reset(token)
+
+    async def _refill(self, bot: Bot) -> None:
+        while len(self._topics) < self.size:
+            try:
+                topic = await bot.create_forum_topic(
+                    chat_id=config.tg_bot.forum_id, name=POOL_TOPIC_NAME
+                )
+            except TelegramAPIError as e:
+                logger.error(f"[Пул тем] Ошибка при создании свободной темы: {e}")
+                return
+
+            topic_id = topic.message_thread_id
+            try:
+                async with self._session_pool() as session:
+                    repo = RequestsRepo(session)
+                    await repo.topic_pool.add_topic(topic_id)
+                    await repo.commit()
+            except Exception as e:
+                # Несохраненная тема потерялась бы при перезапуске
+                logger.error(f"[Пул тем] Ошибка при сохранении свободной темы {topic_id}: {e}")
+                await self._delete_topic(bot, topic_id)
+                return
+
+            self._topics.append(topic_id)
+
+    async def _delete_topic(self, bot: Bot, topic_id: int) -> bool:
+        """
+        Удаляет свободную тему с форума.
+
+        Returns:
+            bool: True, если темы больше нет на форуме
+        """
+        try:
+            await bot.delete_forum_topic(
+                chat_id=config.tg_bot.forum_id, message_thread_id=topic_id
+            )
+            return True
+        except TelegramBadRequest as e:
+            message = e.message.lower()
+            if "topic_id_invalid" in message or "thread not found" in message:
+                return True
+            logger.warning(f"[Пул тем] Не удалось удалить свободную тему {topic_id}: {e}")
+        except TelegramAPIError as e:
+            logger.warning(f"[Пул тем] Не удалось удалить свободную тему {topic_id}: {e}")
+        return False
+
+    def stop(self) -> None:
+        """
+        Останавливает пополнение пула. Свободные темы остаются в БД до следующего запуска.
+        """
+        if self._refill_task is not None:
+            self._refill_task.cancel()
+
+    def __len__(self) -> int:
+        return len(self._topics)
+
+
+topic_pool = TopicPool(size=config.tg_bot.topic_pool_size)
@@ -0,0 +1,56 @@
+import asyncio
+import logging
+
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from aiohttp import web
+
+from tgbot.config import WebhookConfig
+from tgbot.middlewares.concurrency import ConcurrencyLimitMiddleware
+from tgbot.services.logger import setup_logging
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+# Bot API принимает max_connections от 1 до 100
+MAX_WEBHOOK_CONNECTIONS = 100
+
+
+async def run_webhook(dp: Dispatcher, bot: Bot, webhook: WebhookConfig) -> None:
+    """
+    Регистрирует вебхук в Telegram и обрабатывает обновления aiohttp сервером до остановки.
+
+    Ответ Telegram отправляется после обработки обновления, а одновременно обрабатывается
+    не больше max_concurrency обновлений. Когда все слоты заняты, ответы задерживаются,
+    и Telegram сам снижает темп отправки, не открывая больше max_connections соединений.
+    """
+    dp.update.outer_middleware(ConcurrencyLimitMiddleware(webhook.max_concurrency))
+
+    app = web.Application()
+    SimpleRequestHandler(
+        dispatcher=dp,
+        bot=bot,
+        handle_in_background=False,
+        secret_token=webhook.secret,
+    ).register(app, path=webhook.path)
+    setup_application(app, dp, bot=bot)
+
+    await bot.set_webhook(
+        url=webhook.webhook_url,
+        secret_token=webhook.secret,
+        max_connections=min(webhook.max_concurrency, MAX_WEBHOOK_CONNECTIONS),
+        allowed_updates=dp.resolve_used_update_types(),
+    )
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, host=webhook.host, port=webhook.port)
+    await site.start()
+    logger.info(
+        f"[Вебхук] Сервер запущен на {webhook.host}:{webhook.port}{webhook.path}"
+    )
+
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()